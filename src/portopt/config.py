@@ -23,6 +23,8 @@ def default_config() -> Dict[str, Any]:
         - ignore_tickers: Empty list of tickers to ignore
         - accounts: Empty dict of account metadata
         - asset_class_hierarchy: Empty dict defining asset class hierarchy
+        - cache_dir: None - directory for on-disk (parquet) caches of the holdings, factor weights
+          and the daily prices and ticker information, disabled by default
     """
     default_config = {
         'proxy_funds': {},
@@ -30,7 +32,8 @@ def default_config() -> Dict[str, Any]:
         'missing_ticker_patterns': {},
         'ignore_tickers': [],
         'accounts': {},
-        'asset_class_hierarchy': {}
+        'asset_class_hierarchy': {},
+        'cache_dir': None
     }
     default_config['columns'] = {
         Constants.TICKER_COL: {
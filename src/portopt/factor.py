@@ -7,14 +7,19 @@ information from configuration files.
 Functions:
     load_factor_dimension: Load factor hierarchy into a DataFrame
     load_factor_weights: Load factor weights for tickers
+    factor_weights_cache_key: Compute a cache key for a factor weights file
     validate_factor_hierarchy: Validate factor hierarchy configuration
 """
 
+import os
+import json
+import hashlib
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Any, List, Tuple
 
 from .constants import Constants
+from .config import default_config
 
 def get_hierarchy_depth(hierarchy: Dict[str, Any]) -> int:
     """
@@ -137,7 +142,6 @@ def load_factor_dimension(config: Optional[dict] = None) -> pd.DataFrame:
     """
     # Load configuration if not provided
     if config is None:
-        from portopt.config import default_config
         config = default_config()
 
     # Extract and validate hierarchy
@@ -289,6 +293,27 @@ def load_fund_factor_weights(file_path: str) -> pd.DataFrame:
 
     return data
 
+def factor_weights_cache_key(file_path: str, config: Optional[dict] = None) -> str:
+    """
+    Compute a key that identifies a factor weights file and the configuration
+    (factor hierarchy) used to validate it.
+
+    The key changes whenever the file is modified (based on size and
+    modification time) or the configuration changes.
+
+    Args:
+        file_path: Path to CSV file containing fund factor weights
+        config: Optional configuration dictionary used to load the factor dimension
+
+    Returns:
+        Hex digest identifying the factor weights file and configuration.
+    """
+    stat = os.stat(file_path)
+    hasher = hashlib.sha256()
+    hasher.update(f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    hasher.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
 def load_factor_weights(file_path: str,
                        factor_dim: pd.DataFrame,
                        verbose: bool = False) -> pd.DataFrame:
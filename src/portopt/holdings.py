@@ -3,10 +3,13 @@ Need an overview docstring for the module.
 """
 from typing import Optional
 import os
+import json
+import hashlib
 import pandas as pd
 import numpy as np
 import re
 import csv
+from datetime import date
 
 from .constants import Constants
 from .utils import CaseInsensitiveDict
@@ -45,6 +48,11 @@ def holdings_substitute_proxies(holdings: pd.DataFrame,
     if 'Original Quantity' not in result.columns:
         result['Original Quantity'] = result[Constants.QUANTITY_COL]
 
+    # Imported here (once, not per proxy) so that loading holdings without proxy
+    # funds doesn't import the market data dependencies
+    if proxy_funds:
+        from portopt.market_data import get_latest_ticker_price
+
     # Process proxy fund substitutions
     for private_ticker, proxy_ticker in proxy_funds.items():
         if private_ticker in result.index:
@@ -52,7 +60,6 @@ def holdings_substitute_proxies(holdings: pd.DataFrame,
                 print(f"Substituting {private_ticker} with proxy {proxy_ticker}")
 
             # Get the proxy price
-            from portopt.market_data import get_latest_ticker_price
             proxy_price = get_latest_ticker_price(proxy_ticker)
 
             if proxy_price is None or proxy_price == 0:
@@ -504,28 +511,16 @@ def consolidate_holdings(*holdings: pd.DataFrame) -> pd.DataFrame:
 
     return result
 
-def load_and_consolidate_holdings(*args,
-                                config: Optional[dict] = None,
-                                verbose: bool = False) -> pd.DataFrame:
+def resolve_holdings_files(*args, verbose: bool = False) -> list[str]:
     """
-    Load and consolidate holdings from multiple CSV files.
-
-    This function accepts inputs in any of the following forms:
-      - A single argument that is a list of file paths (assumed to be string file paths).
-      - A single argument that is a directory path; in this case, all '.csv'
-        files in the directory will be used.
-      - Multiple arguments, with each argument being a file path.
+    Resolve holdings file arguments to a list of candidate file paths.
 
     Args:
         *args: A list of file paths, a directory path, or multiple file path arguments.
-        config: Optional dictionary containing configuration settings including:
-               - proxy_funds: Mapping of private trust tickers to proxy tickers
-               - field_mappings: CSV field name mappings
-               - missing_ticker_patterns: Rules for identifying missing tickers
-        verbose: Optional; if True, prints verbose messages during loading. Defaults to False.
+        verbose: Optional; if True, prints verbose messages. Defaults to False.
 
     Returns:
-        pd.DataFrame: A consolidated DataFrame of holdings loaded from all valid CSV files.
+        List of candidate holdings file paths.
 
     Raises:
         ValueError: If no candidate files are found from the provided arguments.
@@ -550,6 +545,64 @@ def load_and_consolidate_holdings(*args,
     if not candidate_files:
         raise ValueError("No candidate files found from the provided arguments.")
 
+    return candidate_files
+
+def holdings_cache_key(*args, config: Optional[dict] = None) -> str:
+    """
+    Compute a key that identifies a set of holdings files and the configuration
+    used to load them.
+
+    The key changes whenever a holdings file is added, removed or modified
+    (based on size and modification time) or the configuration changes, so it
+    can be used to decide whether a cached copy of the consolidated holdings is
+    still fresh. When proxy funds are configured the key also changes daily,
+    since the proxy quantities are calculated from the latest proxy prices.
+
+    Args:
+        *args: A list of file paths, a directory path, or multiple file path arguments.
+        config: Optional configuration dictionary used to load the holdings.
+
+    Returns:
+        Hex digest identifying the holdings files and configuration.
+    """
+    hasher = hashlib.sha256()
+    for file in sorted(resolve_holdings_files(*args)):
+        stat = os.stat(file)
+        hasher.update(f"{os.path.abspath(file)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    hasher.update(json.dumps(config, sort_keys=True, default=str).encode())
+    if config and config.get('proxy_funds'):
+        hasher.update(date.today().isoformat().encode())
+    return hasher.hexdigest()
+
+def load_and_consolidate_holdings(*args,
+                                config: Optional[dict] = None,
+                                verbose: bool = False) -> pd.DataFrame:
+    """
+    Load and consolidate holdings from multiple CSV files.
+
+    This function accepts inputs in any of the following forms:
+      - A single argument that is a list of file paths (assumed to be string file paths).
+      - A single argument that is a directory path; in this case, all '.csv'
+        files in the directory will be used.
+      - Multiple arguments, with each argument being a file path.
+
+    Args:
+        *args: A list of file paths, a directory path, or multiple file path arguments.
+        config: Optional dictionary containing configuration settings including:
+               - proxy_funds: Mapping of private trust tickers to proxy tickers
+               - field_mappings: CSV field name mappings
+               - missing_ticker_patterns: Rules for identifying missing tickers
+        verbose: Optional; if True, prints verbose messages during loading. Defaults to False.
+
+    Returns:
+        pd.DataFrame: A consolidated DataFrame of holdings loaded from all valid CSV files.
+
+    Raises:
+        ValueError: If no candidate files are found from the provided arguments.
+        TypeError: If an argument is not a string or a list of strings representing file paths.
+    """
+    candidate_files = resolve_holdings_files(*args, verbose=verbose)
+
     # Load holdings for each candidate; file-level validation is handled in load_holdings.
     holdings_list = [load_holdings(file, config=config, verbose=verbose)
                     for file in candidate_files]
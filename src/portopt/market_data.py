@@ -8,6 +8,7 @@ options.
 Functions:
     get_tickers_data: Retrieve historical price data for multiple securities
     get_latest_ticker_prices: Get current prices for multiple securities
+    tickers_cache_key: Compute a daily cache key for market data of multiple securities
     get_latest_ticker_price: Get current price for a single security or option
     get_latest_security_price: Get current price for a stock/ETF/mutual fund
     get_latest_option_price: Get current price for an options contract
@@ -20,7 +21,9 @@ Dependencies:
 """
 
 import re
+import hashlib
 import warnings
+from datetime import date
 import numpy as np
 import pandas as pd
 import yfinance as yf
@@ -389,6 +392,25 @@ def get_tickers_data(tickers: set[str] | list[str],
     except Exception as e:
         raise ValueError(f"Error retrieving data: {str(e)}")
 
+def tickers_cache_key(tickers: pd.Index | set[str] | list[str], as_of: date | None = None) -> str:
+    """
+    Compute a key that identifies a set of tickers on a given day.
+
+    The key includes the date so that cached market data for the same tickers
+    is reused for the rest of the day and refreshed on the next day.
+
+    Args:
+        tickers: Index, set, or list of ticker symbols
+        as_of: Date the market data was retrieved (default: today)
+
+    Returns:
+        Hex digest identifying the tickers and date.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"{(as_of or date.today()).isoformat()}\n".encode())
+    hasher.update("\n".join(sorted(set(tickers))).encode())
+    return hasher.hexdigest()
+
 def get_latest_ticker_prices(tickers: pd.Index | set[str] | list[str], verbose: bool = False) -> pd.DataFrame:
     """
     Retrieve the most recent prices for multiple tickers.
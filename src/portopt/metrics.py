@@ -14,12 +14,330 @@ The mixin supports:
 Dependencies:
     - ibis: Analytics framework for expressing complex queries
     - duckdb: Backend engine for query execution
+    - pyarrow: Streams query results into pandas
 """
 
+import os
+import sys
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import ibis
 from ibis import _
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional, Union
+import pyarrow as pa
+from typing import Iterable, List, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Number of threads used by the DuckDB connection
+DUCKDB_THREADS = os.cpu_count() or 1
+
+# Fraction of physical memory DuckDB is allowed to use
+DUCKDB_MEMORY_FRACTION = 0.75
+
+
+def _duckdb_memory_limit() -> Optional[str]:
+    """Get the DuckDB memory limit as a fraction of physical memory.
+
+    Returns:
+        Memory limit string (e.g. '12288MiB') or None if physical memory
+        can't be determined (DuckDB's default limit is used)
+    """
+    try:
+        physical_memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+    return f"{int(physical_memory * DUCKDB_MEMORY_FRACTION) // 2**20}MiB"
+
+
+# Number of rows in each record batch streamed from DuckDB (DuckDB's vector size)
+RESULT_BATCH_SIZE = 2048
+
+# Maximum number of compiled SQL statements (and built metrics queries) cached
+# per connection
+SQL_CACHE_SIZE = 128
+
+# Maximum number of getMetrics results memoized per instance
+RESULT_CACHE_SIZE = 32
+
+# Dimensions of the valued holdings table - metrics grouped and filtered only by
+# these are calculated with pandas instead of a DuckDB query
+HOLDINGS_DIMENSIONS = frozenset({'Ticker', 'Account'})
+
+# Fact table columns that are aggregated (or consumed by the factor weight
+# pre-aggregation) and so can't be used as dimensions
+AGGREGATE_COLUMNS = frozenset({'Quantity', 'Value', 'Weight', 'Weighted Value'})
+
+# Getter methods that provide the optional factor tables
+OPTIONAL_TABLE_GETTERS = {
+    'factors': 'getFactors',
+    'factor_weights': 'getFactorWeights'
+}
+
+# pandas 3 always uses Copy-on-Write - earlier versions enable it where needed
+PANDAS_COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3
+
+# Maximum number of combined dimension codes (product of the category counts)
+# summed directly with np.bincount - larger code spaces use a pandas groupby
+MAX_GROUP_CODES = 1 << 22
+
+# Minimum number of fact table rows for metrics to be calculated by a DuckDB
+# query - smaller tables are aggregated with pandas, where DuckDB's fixed
+# per-query overhead would dominate
+METRICS_DUCKDB_THRESHOLD = 50_000
+
+
+@contextmanager
+def _verbose_logging(verbose: bool):
+    """Print this module's debug log messages to stdout while the context is active.
+
+    Args:
+        verbose: If False, logging is left unchanged
+    """
+    if not verbose:
+        yield
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    previous_level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        yield
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(previous_level)
+
+
+def _debug_sql(title: str, expr: ibis.Expr) -> None:
+    """Log the SQL for an expression - only compiled if debug logging is enabled.
+
+    Args:
+        title: Title of the query
+        expr: Expression to log the SQL for
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s --------------------------------\n%s", title, ibis.to_sql(expr))
+
+
+def _flatten_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Move the named index levels of a DataFrame into columns.
+
+    DataFrames that are already flat (unnamed default index) are returned as is,
+    and the columns of other DataFrames are shared with the result rather than
+    copied.
+
+    Args:
+        df: DataFrame to flatten
+
+    Returns:
+        DataFrame with the named index levels as columns
+    """
+    if all(name is None for name in df.index.names):
+        return df
+    # The flattened frames are only read (merged or converted to Arrow), so the
+    # columns don't need to be copied - pandas 3 always uses Copy-on-Write
+    if PANDAS_COPY_ON_WRITE:
+        return df.reset_index()
+    with pd.option_context('mode.copy_on_write', True):
+        return df.reset_index()
+
+
+def _dictionary_encode(table: pa.Table) -> pa.Table:
+    """Dictionary encode the string columns of an Arrow table.
+
+    The string columns of the metrics tables are low-cardinality dimensions
+    (Ticker, Account, Factor, Level_*), so DuckDB can hash and compare the
+    dictionary codes instead of the strings when grouping and filtering.
+
+    Args:
+        table: Arrow table to encode
+
+    Returns:
+        Arrow table with string columns dictionary encoded
+    """
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+    return table
+
+def _filter_values(values: Union[str, Iterable[str]]) -> List[str]:
+    """Convert the values of a dimension filter to a list.
+
+    Args:
+        values: A single value or any iterable of values
+
+    Returns:
+        List of the filter values
+    """
+    return [values] if isinstance(values, str) else list(values)
+
+def _filter_mask(column: pd.Series, values: List[str]) -> np.ndarray:
+    """Get a mask of the rows of a column that match any of the filter values.
+
+    Categorical columns are matched through their categories and row codes, so
+    each distinct value is compared once instead of hashing every row.
+
+    Args:
+        column: Column to filter
+        values: Values to include
+
+    Returns:
+        Boolean array with True for the rows that match
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Missing values (code -1) select the appended False
+        matches = np.append(column.cat.categories.isin(values), False)
+        return matches[column.cat.codes.to_numpy()]
+    return column.isin(values).to_numpy()
+
+def _filter_value_type(column: Optional[pd.Series]) -> pa.DataType:
+    """Get the Arrow type of the filter values for a fact table column.
+
+    Args:
+        column: Filtered fact table column, or None if it is not known
+
+    Returns:
+        Arrow type of the column values (of the categories for categorical
+        columns), or string for text and unknown columns
+    """
+    if column is None:
+        return pa.string()
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if dtype.kind in 'biuf':
+        return pa.from_numpy_dtype(dtype)
+    return pa.string()
+
+def _group_sums(df: pd.DataFrame, dimensions: List[str], columns: List[str]) -> Optional[pd.DataFrame]:
+    """Sum columns grouped by categorical dimensions using the category codes.
+
+    The category codes of the dimensions are combined into a single integer code
+    per row and the columns are summed with np.bincount, which avoids the hashing
+    and sorting of a pandas groupby. Only combinations that occur are returned,
+    sorted by the dimensions with missing values last (like a sorted groupby with
+    dropna=False), and missing values in the summed columns are skipped.
+
+    Args:
+        df: DataFrame with categorical dimension columns
+        dimensions: Dimensions to group by
+        columns: Columns to sum
+
+    Returns:
+        DataFrame with the dimension columns (with the original, not categorical,
+        values) and the summed columns, or None if a dimension is not categorical
+        or the combined code space is too large (more than MAX_GROUP_CODES)
+    """
+    # Dimensions without category codes (e.g. Price) are grouped by pandas
+    if not all(isinstance(df[dim].dtype, pd.CategoricalDtype) for dim in dimensions):
+        return None
+
+    # Each dimension has one code per category plus one for missing values
+    sizes = [len(df[dim].cat.categories) + 1 for dim in dimensions]
+    if np.prod(sizes, dtype=np.float64) > MAX_GROUP_CODES:
+        return None
+    space = int(np.prod(sizes))
+
+    codes = np.zeros(len(df), dtype=np.int64)
+    for dim, size in zip(dimensions, sizes):
+        dim_codes = df[dim].cat.codes.to_numpy()
+        codes = codes * size + np.where(dim_codes < 0, size - 1, dim_codes)
+
+    observed = np.flatnonzero(np.bincount(codes, minlength=space))
+
+    result = {}
+    remainder = observed
+    for dim, size in reversed(list(zip(dimensions, sizes))):
+        categories = df[dim].cat.categories
+        dim_codes = remainder % size
+        dim_codes[dim_codes == size - 1] = -1
+        # Take the values directly from the categories (-1 takes a missing value)
+        result[dim] = categories.take(dim_codes, allow_fill=True, fill_value=np.nan)
+        remainder = remainder // size
+    result = {dim: result[dim] for dim in dimensions}
+
+    for col in columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind == 'f':
+            # Skip missing values - infinite values are summed like a pandas groupby
+            values_or_zero = np.where(np.isnan(values), 0.0, values)
+        else:
+            values_or_zero = values
+        # bincount sums as float64 (int64 without any rows) - keep the column dtype
+        sums = np.bincount(codes, weights=values_or_zero, minlength=space)[observed]
+        result[col] = sums.astype(values.dtype, copy=False)
+
+    return pd.DataFrame(result)
+
+def _check_factor_columns(columns: Optional[Iterable[str]], requires_factor_levels: bool) -> None:
+    """Check that the factor table needed for the requested dimensions/filters is available.
+
+    Args:
+        columns: Columns of the holdings factor table (None if the factor weights
+                 are not available)
+        requires_factor_levels: Whether the factor levels are needed
+
+    Raises:
+        ValueError: If the factor weights or factor levels are not available
+    """
+    if columns is None:
+        raise ValueError("Factor weights are required for the requested dimensions/filters, "
+                       "but factor_weights table is not available")
+    if requires_factor_levels and not any(col.startswith('Level_') for col in columns):
+        raise ValueError("Factor levels are required for the requested dimensions/filters, "
+                       "but factors table is not available")
+
+
+def _check_columns(columns: Iterable[str], dimensions: Iterable[str],
+                   filters: Optional[Dict[str, List[str]]] = None) -> None:
+    """Check that the requested dimensions and filters are columns of the fact table.
+
+    Checked before the metrics are calculated so the pandas calculation and the
+    DuckDB query accept the same dimensions and filters and raise the same errors.
+
+    Args:
+        columns: Columns of the fact table the metrics are calculated from (the
+                 factor tables' Weighted Value is the query's Value column)
+        dimensions: Dimensions to group by (any column except AGGREGATE_COLUMNS)
+        filters: Dictionary of filters (see getMetrics)
+
+    Raises:
+        ValueError: If a dimension or filter is not a column of the fact table
+    """
+    available = [col for col in columns if col not in AGGREGATE_COLUMNS]
+    missing_dims = [dim for dim in dimensions if dim not in available]
+    if missing_dims:
+        raise ValueError(f"Requested dimensions not found in query: {missing_dims}. "
+                       f"Available columns: {available}")
+    available = [col for col in columns if col != 'Weighted Value']
+    missing_filters = [dim for dim in (filters or ()) if dim not in available]
+    if missing_filters:
+        raise ValueError(f"Requested filters not found in query: {missing_filters}. "
+                       f"Available columns: {available}")
+
+
+def _compute_allocations(values: np.ndarray, total: Optional[float] = None) -> np.ndarray:
+    """Calculate the allocation of each value relative to the total value.
+
+    Args:
+        values: Array of values (NaN values are ignored when summing the total)
+        total: Total value to divide by. If None, the sum of values is used.
+
+    Returns:
+        Array of allocations with the same shape as values
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if total is None:
+        total = np.nansum(values)
+    total = float(total)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return values / total
 
 
 class MetricsMixin:
@@ -30,9 +348,13 @@ class MetricsMixin:
     calculating metrics while providing a clean interface.
     """
 
+    # Minimum number of fact table rows for metrics to be calculated with DuckDB
+    # rather than pandas - can be overridden per instance
+    metrics_duckdb_threshold = METRICS_DUCKDB_THRESHOLD
+
     def _requires_factor_tables(self,
                                dimensions: List[str],
-                               filters: Optional[Dict[str, Union[str, List[str]]]] = None) -> tuple[bool, bool]:
+                               filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None) -> tuple[bool, bool]:
         """Determine if factor tables are required based on dimensions and filters.
 
         This centralizes the logic for determining when to join factor_weights and factors tables.
@@ -46,110 +368,311 @@ class MetricsMixin:
             - requires_factor_weights: True if factor_weights table is needed
             - requires_factor_levels: True if factors table is needed (for Level_* columns)
         """
-        requires_factor_weights = False
-        requires_factor_levels = False
-
-        # Check dimensions
-        if dimensions:
-            requires_factor_weights = any(d.startswith('Level_') or d == 'Factor' for d in dimensions)
-            requires_factor_levels = any(d.startswith('Level_') for d in dimensions)
+        # Check dimensions and filters together in a single pass
+        columns = set(dimensions or ()).union(filters or ())
 
-        # Check filters if they exist
-        if filters:
-            requires_factor_weights = requires_factor_weights or \
-                                      any(d.startswith('Level_') or d == 'Factor' for d in filters.keys())
-            requires_factor_levels = requires_factor_levels or \
-                                     any(d.startswith('Level_') for d in filters.keys())
+        # Level_* columns come from the factors table, which is joined via factor weights
+        requires_factor_levels = any(col.startswith('Level_') for col in columns)
+        requires_factor_weights = requires_factor_levels or 'Factor' in columns
 
         return requires_factor_weights, requires_factor_levels
 
-    def _get_base_tables(self,
-                        dimensions: List[str] = None,
-                        filters: Optional[Dict[str, Union[str, List[str]]]] = None) -> Dict[str, ibis.Table]:
-        """Get the base tables needed for metrics calculations.
+    def _has_table_source(self, table_name: str) -> bool:
+        """Check whether the data source for an optional table is available.
+
+        The Portfolio class sets a _has_<table_name> capability flag when it is
+        initialized. If the flag has not been set, the table is available when the
+        corresponding getter method exists.
 
         Args:
-            dimensions: List of dimensions (optional, for optimization)
-            filters: Dictionary of filters (optional, for optimization)
+            table_name: Name of the optional table ('factors' or 'factor_weights')
 
         Returns:
-            Dict mapping table names to ibis Table objects
+            True if the table can be loaded, False otherwise
         """
-        # Create DuckDB connection
-        con = ibis.duckdb.connect()
+        has_source = getattr(self, f'_has_{table_name}', None)
+        if has_source is None:
+            has_source = callable(getattr(self, OPTIONAL_TABLE_GETTERS[table_name], None))
+        return has_source
 
-        # Register dataframes as tables
-        tables = {}
+    def _load_optional_table(self, table_name: str) -> Optional[pd.DataFrame]:
+        """Load the data for an optional table if its source is available.
 
-        # Holdings table - core fact table (always needed)
-        holdings_df = self.getHoldings().reset_index()
-        tables['holdings'] = con.create_table('holdings', holdings_df)
+        If a configured source turns out to be missing (FileNotFoundError), its
+        capability flag is cleared so that later calls don't try to load it again.
+        Any other error is raised to the caller.
 
-        # Prices table - for calculating values (always needed)
-        prices_df = self.getPrices().reset_index()
-        tables['prices'] = con.create_table('prices', prices_df)
+        Args:
+            table_name: Name of the optional table ('factors' or 'factor_weights')
 
-        # Optional dimension tables
+        Returns:
+            DataFrame for the table or None if it is not available
+        """
+        if not self._has_table_source(table_name):
+            return None
         try:
-            # Accounts dimension
-            accounts_df = self.getAccounts().reset_index()
-            tables['accounts'] = con.create_table('accounts', accounts_df)
-        except:
-            pass
+            return getattr(self, OPTIONAL_TABLE_GETTERS[table_name])()
+        except FileNotFoundError:
+            setattr(self, f'_has_{table_name}', False)
+            return None
+
+    def _get_connection(self) -> ibis.BaseBackend:
+        """Get the DuckDB connection used for metrics calculations.
+
+        The connection is created on first use and reused by later calls so that
+        DuckDB's thread pool and catalog persist across getMetrics calls.
+
+        Returns:
+            ibis DuckDB backend connection
+        """
+        con = getattr(self, '_con', None)
+        if con is None:
+            # Metrics results are aggregates with no defined row order, so DuckDB
+            # doesn't need to preserve the scan order of the registered tables
+            config = {'threads': DUCKDB_THREADS, 'preserve_insertion_order': False}
+            memory_limit = _duckdb_memory_limit()
+            if memory_limit is not None:
+                config['memory_limit'] = memory_limit
+            con = ibis.duckdb.connect(**config)
+            self._con = con
+        return con
+
+    def _close_connection(self) -> None:
+        """Close the DuckDB connection and drop the tables registered on it.
+
+        A new connection is created (and tables registered again) the next time
+        metrics are calculated.
+        """
+        con = getattr(self, '_con', None)
+        if con is not None:
+            con.disconnect()
+        self._con = None
+        self._ibis_tables = {}
+        self._filter_tables = {}
+        self._metrics_query_cache = OrderedDict()
+        self._total_value_cache = {}
+
+    def _get_holdings_valued(self) -> pd.DataFrame:
+        """Get holdings joined with prices and the derived Value column.
+
+        Value (Quantity * Price) is computed once and cached until either the
+        holdings or the prices are refreshed, so metrics queries don't need to
+        join the prices table or recompute the value of each position.
+
+        Returns:
+            Flat DataFrame (index levels as columns) containing the holdings
+            columns (Ticker, Account, Quantity, ...) plus:
+            - Price
+            - Value
+        """
+        holdings = self.getHoldings()
+        prices = self.getPrices()
+
+        cache = getattr(self, '_holdings_valued_cache', None)
+        if cache is not None and cache[0] is holdings and cache[1] is prices:
+            return cache[2]
+
+        # Flatten the holdings index while joining so later steps don't need to copy
+        holdings_valued = _flatten_index(holdings).merge(
+            prices[['Price']], left_on='Ticker', right_index=True, how='inner'
+        )
+        holdings_valued['Value'] = holdings_valued['Quantity'] * holdings_valued['Price']
+
+        # The holdings dimensions are grouped and filtered by every metrics
+        # calculation - as categoricals pandas groups them on integer codes
+        for dim in HOLDINGS_DIMENSIONS & set(holdings_valued.columns):
+            holdings_valued[dim] = holdings_valued[dim].astype('category')
+
+        self._holdings_valued_cache = (holdings, prices, holdings_valued)
+        return holdings_valued
+
+    def _register_table(self, name: str, df: pd.DataFrame) -> ibis.Table:
+        """Register a DataFrame as a table on the DuckDB connection.
+
+        The DataFrame is converted to an Arrow table (with dictionary encoded
+        string columns) which DuckDB scans in place, so the data is not copied
+        into DuckDB's storage. Registered tables are
+        cached along with the DataFrame they were created from and are only
+        converted again when the getter returns a different DataFrame (e.g.
+        after a forceRefresh).
+
+        The metrics caches detect changed data by the identity of the source
+        DataFrames rather than a data version counter. Each cache entry holds a
+        reference to its source DataFrames, so their ids can't be reused by new
+        DataFrames while the entry exists, and the host class doesn't need to
+        track versions (the getters only need to return the same DataFrame until
+        the data is reloaded).
+
+        Args:
+            name: Name of the table
+            df: DataFrame to register (named index levels are registered as columns)
+
+        Returns:
+            ibis Table for the registered DataFrame
+        """
+        registered = getattr(self, '_ibis_tables', None)
+        if registered is None:
+            registered = self._ibis_tables = {}
+
+        cached = registered.get(name)
+        if cached is not None and cached[0] is df:
+            return cached[1]
+
+        # Keep a reference to the Arrow table - DuckDB only holds a view over it
+        arrow_table = _dictionary_encode(pa.Table.from_pandas(_flatten_index(df), preserve_index=False))
+        con = self._get_connection()
+        con.con.register(name, arrow_table)
+        table = con.table(name)
+
+        registered[name] = (df, table, arrow_table)
+
+        # Registered data changed - queries built on the previous table schemas
+        # are no longer valid
+        self._metrics_query_cache = OrderedDict()
+        return table
+
+    def _register_filters(
+        self,
+        filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None,
+        fact_table: Optional[pd.DataFrame] = None
+    ) -> Dict[str, ibis.Table]:
+        """Register the values of each dimension filter as a table.
+
+        Filter values are bound to the metrics queries through these tables
+        instead of being written into the SQL as literals. The generated SQL then
+        only depends on which dimensions are filtered, so queries (and their
+        compiled SQL) are reused when the same dimensions are filtered on
+        different values. Each filter table has a single 'value' column with the
+        type of the filtered column (see _filter_value_type).
+
+        Args:
+            filters: Dictionary of filters. Keys are dimension names, values are a
+                     single value or a list of values to include.
+            fact_table: Fact table the filtered columns are read from. If None, all
+                        filter values are strings.
+
+        Returns:
+            Dict mapping each filtered dimension to the table of its values
+        """
+        registered = getattr(self, '_filter_tables', None)
+        if registered is None:
+            registered = self._filter_tables = {}
+
+        filter_tables = {}
+        con = self._get_connection()
+        for i, (dim, values) in enumerate((filters or {}).items()):
+            name = f'filter_values_{i}'
+            value_type = _filter_value_type(fact_table[dim] if fact_table is not None else None)
+            values = _filter_values(values)
+            if pa.types.is_string(value_type):
+                values = [str(v) for v in values]
+            values = tuple(values)
+            cached = registered.get(name)
+            same_type = cached is not None and cached[1].schema.field('value').type == value_type
+            if same_type and cached[2] == values:
+                # Same values already bound
+                filter_tables[dim] = cached[0]
+                continue
+
+            arrow_table = pa.table({'value': pa.array(values, type=value_type)})
+            # Re-registering replaces the values the existing table reads - a table
+            # of another type needs a new ibis table with the new schema
+            con.con.register(name, arrow_table)
+            table = cached[0] if same_type else con.table(name)
+            # Keep a reference to the Arrow table - DuckDB only holds a view over it
+            registered[name] = (table, arrow_table, values)
+            filter_tables[dim] = table
+
+        return filter_tables
+
+    def _get_fact_tables(self,
+                         requires_factor_weights: bool = True,
+                         requires_factor_levels: bool = True,
+                         by_ticker: bool = False) -> Dict[str, pd.DataFrame]:
+        """Get the pre-joined fact tables needed for metrics calculations.
+
+        Args:
+            requires_factor_weights: Whether the factor weights are needed (see
+                                     _requires_factor_tables). Default is True.
+            requires_factor_levels: Whether the factor levels are needed. Default is True.
+            by_ticker: Whether the factor table can be joined from the holdings summed
+                       per ticker (see _get_holdings_factors). Default is False.
+
+        Returns:
+            Dict mapping table names (holdings_valued and, if the factor weights are
+            needed and available, holdings_factors or holdings_factor_levels - or
+            ticker_factors or ticker_factor_levels by ticker) to DataFrames
+        """
+        # The first factor query loads the factor weights (and the factors they are
+        # validated against) from local files in the background while the holdings
+        # and prices (fetched from the market data service) are loaded. The two
+        # loads share no cached data, so the getters don't need to be locked.
+        # Portfolios without factor weights never start the loader thread.
+        factor_weights_future = None
+        if requires_factor_weights and not getattr(self, '_holdings_factors_cache', None) \
+                and self._has_table_source('factor_weights'):
+            executor = ThreadPoolExecutor(max_workers=1)
+            factor_weights_future = executor.submit(self._load_optional_table, 'factor_weights')
+            executor.shutdown(wait=False)
+
+        # Valued holdings table - core fact table (always needed)
+        fact_tables = {'holdings_valued': self._get_holdings_valued()}
+
+        # The account and ticker dimension tables are not loaded - no metrics query
+        # joins them, and loading ticker information queries Yahoo Finance
 
         # Factor tables - only load if needed
-        if dimensions is not None and filters is not None:
-            requires_factor_weights, requires_factor_levels = self._requires_factor_tables(dimensions, filters)
-
-            if requires_factor_weights:
-                try:
-                    # Factor weights fact table
-                    weights_df = self.getFactorWeights().reset_index()
-                    tables['factor_weights'] = con.create_table('factor_weights', weights_df)
-                except:
-                    pass
-
-                if requires_factor_levels:
-                    try:
-                        # Factors dimension
-                        factors_df = self.getFactors().reset_index()
-                        tables['factors'] = con.create_table('factors', factors_df)
-                    except:
-                        pass
+        if factor_weights_future is not None:
+            factor_weights = factor_weights_future.result()
+        elif requires_factor_weights:
+            factor_weights = self._load_optional_table('factor_weights')
         else:
-            # Fallback: load all factor tables if dimensions/filters not provided
-            try:
-                # Factors dimension
-                factors_df = self.getFactors().reset_index()
-                tables['factors'] = con.create_table('factors', factors_df)
-
-                # Factor weights fact table
-                weights_df = self.getFactorWeights().reset_index()
-                tables['factor_weights'] = con.create_table('factor_weights', weights_df)
-            except:
-                pass
+            factor_weights = None
+        if factor_weights is not None:
+            # Holdings pre-joined with factor weights (and factor levels if needed)
+            factors = self._load_optional_table('factors') if requires_factor_levels else None
+            table_name = 'factor_levels' if factors is not None else 'factors'
+            table_name = ('ticker_' if by_ticker else 'holdings_') + table_name
+            fact_tables[table_name] = self._get_holdings_factors(factor_weights, factors, by_ticker)
 
-        try:
-            # Tickers dimension
-            tickers_df = self.getTickers().reset_index()
-            tables['tickers'] = con.create_table('tickers', tickers_df)
-        except:
-            pass
+        return fact_tables
+
+    def _get_base_tables(self,
+                        requires_factor_weights: bool = True,
+                        requires_factor_levels: bool = True,
+                        by_ticker: bool = False) -> Dict[str, ibis.Table]:
+        """Get the base tables needed for metrics calculations.
+
+        Args:
+            requires_factor_weights: Whether the factor weights are needed (see
+                                     _requires_factor_tables). Default is True.
+            requires_factor_levels: Whether the factor levels are needed. Default is True.
+            by_ticker: Whether the factor table can be joined from the holdings summed
+                       per ticker (see _get_holdings_factors). Default is False.
+
+        Returns:
+            Dict mapping table names (holdings_valued and holdings_factors) to
+            ibis Table objects
+        """
+        # Register dataframes as tables - either factor table is used as holdings_factors
+        tables = {}
+        for name, df in self._get_fact_tables(requires_factor_weights, requires_factor_levels,
+                                              by_ticker).items():
+            key = 'holdings_valued' if name == 'holdings_valued' else 'holdings_factors'
+            tables[key] = self._register_table(name, df)
 
         return tables
 
-    def _handle_undefined_factor_weights(self,
-                                       query: ibis.Table,
-                                       requires_factor_levels: bool) -> ibis.Table:
+    def _handle_undefined_factor_weights(self, df: pd.DataFrame) -> pd.DataFrame:
         """Handle tickers that don't have factor weights defined.
 
         This method creates an "UNDEFINED" factor that matches the structure of the
         user's factor hierarchy, ensuring tickers without factor weights are included
         exactly once in factor-based calculations.
 
-        This adds the UNDEFINED factor to the query, and sets the Weight to 1.0
-        resulting the Factor, Weight, and facrtor hierarchy columns being replaced
-        with COALESCE expressions like the following:
+        This assigns the UNDEFINED factor to the missing rows, and sets the Weight to
+        1.0 resulting in the Factor, Weight, and factor hierarchy columns being filled
+        the same way as the following COALESCE expressions:
             ```
             COALESCE("t8"."Factor", 'UNDEFINED') AS "Factor",
             COALESCE("t8"."Weight", 1.0) AS "Weight",
@@ -158,39 +681,103 @@ class MetricsMixin:
             COALESCE("t8"."Level_2", 'N/A') AS "Level_2"
             ```
         Args:
-            query: The current query with LEFT JOINed factor tables
-            requires_factor_levels: Whether factor level columns are needed
+            df: Holdings LEFT JOINed with the factor tables
 
         Returns:
-            Query with undefined factor weights handled appropriately
+            DataFrame with undefined factor weights handled appropriately
         """
         # Set default values for missing factor weights
-        mutate_exprs = {
-            'Factor': query.Factor.coalesce('UNDEFINED'),
-            'Weight': query.Weight.coalesce(1.0)
+        fill_values = {
+            'Factor': 'UNDEFINED',
+            'Weight': 1.0
         }
 
-        # If factor levels are required, we need to determine the appropriate
-        # default values based on the actual factor hierarchy structure
-        if requires_factor_levels:
-            # Get the level column names from the query columns (they're already joined)
-            level_columns = [col for col in query.columns if col.startswith('Level_')]
+        # For each level column, set undefined tickers to "UNDEFINED" at Level_0
+        # and "N/A" for all other levels (following common convention)
+        for level_col in [col for col in df.columns if col.startswith('Level_')]:
+            fill_values[level_col] = 'UNDEFINED' if level_col == 'Level_0' else 'N/A'
+
+        return df.fillna(fill_values)
 
-            # For each level column, set undefined tickers to "UNDEFINED" at Level_0
-            # and "N/A" for all other levels (following common convention)
-            for level_col in level_columns:
-                if level_col == 'Level_0':
-                    mutate_exprs[level_col] = getattr(query, level_col).coalesce('UNDEFINED')
-                else:
-                    mutate_exprs[level_col] = getattr(query, level_col).coalesce('N/A')
+    def _get_holdings_factors(self,
+                              factor_weights: pd.DataFrame,
+                              factors: Optional[pd.DataFrame] = None,
+                              by_ticker: bool = False) -> pd.DataFrame:
+        """Get valued holdings pre-joined with factor weights and factor levels.
 
-        return query.mutate(**mutate_exprs)
+        The joins are done once and cached until the holdings, prices, factor weights
+        or factors are refreshed, so factor-based metrics queries only need to filter
+        and group a single table.
+
+        Metrics that are not grouped or filtered by Account or Ticker only need the
+        total quantity and value of each ticker. With by_ticker the holdings are
+        summed per ticker before the factor weights are joined, so the table has
+        one row per ticker and factor instead of one row per position and factor.
+
+        Args:
+            factor_weights: Factor weights data indexed by [Ticker, Factor]
+            factors: Factor dimension data to join (for Level_* columns). If None,
+                     only the factor weights are joined.
+            by_ticker: If True, join the holdings summed per ticker. Default is False.
+
+        Returns:
+            DataFrame with one row per position (or ticker) and factor containing the
+            valued holdings columns (only Ticker, Quantity and Value by ticker) plus
+            Factor, Weight, Weighted Value (Value * Weight) and any Level_* columns
+        """
+        holdings_valued = self._get_holdings_valued()
+
+        # Cache each variant separately so alternating queries don't rebuild the table
+        cache = getattr(self, '_holdings_factors_cache', None)
+        if cache is None:
+            cache = self._holdings_factors_cache = {}
+        key = (factors is not None, by_ticker)
+
+        cached = cache.get(key)
+        if cached is not None and cached[0] is holdings_valued \
+                and cached[1] is factor_weights and cached[2] is factors:
+            return cached[3]
+
+        if by_ticker:
+            # Sum the positions of each ticker - the ticker totals are the sums of
+            # the values (and quantities) of the positions they replace
+            holdings = holdings_valued.groupby('Ticker', sort=False, observed=True)[['Quantity', 'Value']].sum()
+            holdings = holdings.reset_index()
+        else:
+            holdings = holdings_valued
+
+        # Join the factor levels to the factor weights first - the weights have
+        # one row per ticker and factor, so the levels are joined to far fewer
+        # rows than after the weights are joined to the holdings
+        weights = _flatten_index(factor_weights)[['Ticker', 'Factor', 'Weight']]
+        if factors is not None:
+            weights = weights.merge(_flatten_index(factors), on='Factor', how='left')
+
+        # Use a LEFT JOIN to include all tickers
+        holdings_factors = holdings.merge(weights, on='Ticker', how='left')
+
+        # Handle tickers without factor weights by assigning them to an "UNDEFINED" factor
+        # This prevents them from being counted multiple times across all factors
+        holdings_factors = self._handle_undefined_factor_weights(holdings_factors)
+
+        # Weight the position values once per data refresh rather than in every
+        # metrics calculation
+        holdings_factors['Weighted Value'] = holdings_factors['Value'] * holdings_factors['Weight']
+
+        # Store the dimension columns as categoricals - they are converted to Arrow
+        # dictionaries when registered, which is faster from categorical codes than
+        # re-hashing the strings (Account is already categorical)
+        for col in holdings_factors.columns:
+            if col in ('Ticker', 'Factor') or col.startswith('Level_'):
+                holdings_factors[col] = holdings_factors[col].astype('category')
+
+        cache[key] = (holdings_valued, factor_weights, factors, holdings_factors)
+        return holdings_factors
 
     def _aggregate_factor_weights(self,
                                   query: ibis.Table,
                                   dimensions: List[str],
-                                  requires_factor_levels: bool,
-                                  verbose: bool = False) -> ibis.Table:
+                                  requires_factor_levels: bool) -> ibis.Table:
         """Pre-aggregate factor weights to prevent double-counting in metrics calculations.
 
         This method is CRITICAL for correct portfolio metrics when factor weights are
@@ -275,14 +862,16 @@ class MetricsMixin:
             query: Query with factor weights joined (contains duplicate rows)
             dimensions: List of dimensions for the final query
             requires_factor_levels: Whether factor level columns are needed
-            verbose: If True, print the generated SQL query
 
         Returns:
-            Query with weights properly aggregated (one row per position)
+            Query with weights properly aggregated (one row per position) and the
+            Value column weighted by the aggregated weights
         """
         # Determine grouping columns for weight aggregation
         # Create list of all columns that should be considered for grouping
-        base_cols = ['Ticker', 'Account', 'Quantity', 'Price']
+        # Value is not grouped - it is determined by the Ticker (Price) and Quantity
+        # and is replaced by the sum of the weighted values
+        base_cols = ['Ticker', 'Account', 'Quantity']
         candidate_cols = base_cols + ['Factor'] + list(dimensions)
 
         # Add columns that exist in the query (avoiding duplicates)
@@ -299,158 +888,111 @@ class MetricsMixin:
 
         # Collect column expressions for the GROUP BY clause
         # All columns in group_cols are guaranteed to exist in query.columns
-        group_exprs = [getattr(query, col) for col in group_cols]
+        group_exprs = [query[col] for col in group_cols]
 
         # Create aggregation expression for weights
         # SUM(Weight) handles fractional weights correctly (e.g., 0.5 + 0.2 = 0.7 for US factors)
         if 'Weight' not in query.columns:
             raise ValueError("Weight column not found in query - this method should only be called when factor weights are present")
-        agg_exprs = [query.Weight.sum().name('Weight')]
+        # The weighted values are pre-computed, so summing them gives the position
+        # value weighted by the summed weights (Value * SUM(Weight)) without a
+        # multiplication per query
+        agg_exprs = [
+            query.Weight.sum().name('Weight'),
+            query['Weighted Value'].sum().name('Value')
+        ]
 
         # Group and aggregate to get one row per position with summed weights
         aggregated_query = query.group_by(group_exprs).aggregate(agg_exprs)
 
-        if verbose:
-            print("Pre-aggregated Weights Query --------------------------------")
-            print(ibis.to_sql(aggregated_query))
+        _debug_sql("Pre-aggregated Weights Query", aggregated_query)
 
         return aggregated_query
 
     def _build_base_query(self,
                           tables: Dict[str, ibis.Table],
                           dimensions: List[str],
-                          filters: Optional[Dict[str, Union[str, List[str]]]] = None,
-                          verbose = False) -> ibis.Table:
-        """Join together the base tables required for metrics calculations.
+                          requires_factor_weights: bool,
+                          requires_factor_levels: bool,
+                          filter_tables: Optional[Dict[str, ibis.Table]] = None,
+                          push_down_filters: bool = False) -> ibis.Table:
+        """Select the pre-joined base table required for metrics calculations.
 
         Args:
             tables: Dict of ibis tables
             dimensions: List of dimensions to include in query
-            filters: Dict of filters to apply to the query
-            verbose: If True, print the generated SQL query. Default is False.
+            requires_factor_weights: Whether the factor weights are needed (see
+                                     _requires_factor_tables)
+            requires_factor_levels: Whether the factor levels are needed
+            filter_tables: Dict of filter value tables to push down (see
+                           _register_filters and push_down_filters)
+            push_down_filters: If True, apply the filters to the base table before
+                               the factor weights are pre-aggregated. This reduces the
+                               rows aggregated and gives the same result as filtering
+                               afterwards because every filter column is also a
+                               grouping column. Default is False.
 
         Returns:
             ibis Table with base joined data
         """
-        # Determine if factor tables are needed based on dimensions and filters
-        requires_factor_weights, requires_factor_levels = self._requires_factor_tables(dimensions, filters)
+        # Start with holdings - prices and values are already joined in
+        query = tables['holdings_valued']
 
-        # Start with holdings and join with prices
-        query = tables['holdings'].join(tables['prices'], 'Ticker')
-
-        # Add factor tables if needed - use LEFT JOINs to include all tickers
+        # Use the pre-joined factor table if needed
         # If factor tables are added ensure that:
-        # - all tickers have a factor weights
+        # - all tickers have a factor weights (handled when the table is built)
         # - factor weights are properly aggregated (no double-counting)
         if requires_factor_weights:
-            if 'factor_weights' not in tables:
-                raise ValueError("Factor weights are required for the requested dimensions/filters, "
-                               "but factor_weights table is not available")
-            query = query.left_join(tables['factor_weights'], 'Ticker')
-            if requires_factor_levels:
-                if 'factors' not in tables:
-                    raise ValueError("Factor levels are required for the requested dimensions/filters, "
-                                   "but factors table is not available")
-                query = query.left_join(tables['factors'], 'Factor')
-
-            # Handle tickers without factor weights by assigning them to an "UNDEFINED" factor
-            # This prevents them from being counted multiple times across all factors
-            query = self._handle_undefined_factor_weights(query, requires_factor_levels)
+            query = tables.get('holdings_factors')
+            _check_factor_columns(None if query is None else query.columns, requires_factor_levels)
+            if push_down_filters:
+                query = self._apply_filters(query, filter_tables)
 
             # CRITICAL: Pre-aggregate factor weights to prevent double-counting
             query = self._aggregate_factor_weights(
-                query, dimensions, requires_factor_levels, verbose
+                query, dimensions, requires_factor_levels
             )
 
-        if verbose and not requires_factor_weights:
-            print("Base Query --------------------------------")
-            print(ibis.to_sql(query))
+        else:
+            if push_down_filters:
+                query = self._apply_filters(query, filter_tables)
+
+            _debug_sql("Base Query", query)
 
         return query
 
     def _apply_filters(
         self,
         query: ibis.Table,
-        filters: Optional[Dict[str, Union[str, List[str]]]] = None,
-        verbose = False
+        filter_tables: Optional[Dict[str, ibis.Table]] = None
     ) -> ibis.Table:
         """Apply dimension filters to the query.
 
         Args:
             query: Query to filter
-            filters: Dict of filters to apply
+            filter_tables: Dict mapping dimensions to the tables of their filter
+                           values (see _register_filters)
 
         Returns:
             Filtered query
         """
-        if not filters:
-            if verbose:
-                print("No filters specified, returning unfiltered query")
+        if not filter_tables:
+            logger.debug("No filters specified, returning unfiltered query")
             return query
 
-        for dim, values in filters.items():
-            # Convert single values to list
-            if isinstance(values, str):
-                values = [values]
-
+        for dim, values in filter_tables.items():
             # Apply filter
-            query = query.filter(getattr(query, dim).isin(values))
+            query = query.filter(query[dim].isin(values.value))
 
-        if verbose:
-            print("Filtered Query --------------------------------")
-            print(ibis.to_sql(query))
+        _debug_sql("Filtered Query", query)
 
         return query
 
-    def _build_total_value_subquery(
-        self,
-        unfiltered_query: ibis.Table,
-        filtered_query: ibis.Table,
-        portfolio_allocation: bool,
-        verbose = False
-    ) -> ibis.Table:
-        """Calculate total value used to calculate Allocation metric.
-
-        Args:
-            unfiltered_query: Query used to calculate total value when portfolio_allocation is True
-            filtered_query: Query used to calculate total value when portfolio_allocation is False
-            portfolio_allocation: Whether to calculate total value for entire portfolio or filtered portfolio
-            verbose: If True, print the generated SQL query. Default is False.
-        """
-        # Identify correct total_value query - unfiltered or filtered
-        if portfolio_allocation:
-            # Use UNFILTERED query to calculate total value used to calculate Allocation
-            if verbose:
-                print("Using UNFILTERED query to calculate total value used to calculate Allocation")
-            base_query = unfiltered_query
-        else:
-            # Use FILTERED query to calculate total value used to calculate Allocation
-            if verbose:
-                print("Using FILTERED query to calculate total value used to calculate Allocation")
-            base_query = filtered_query
-
-        # Build total value expression - used to calculate Allocation
-        # With the new approach, Weight is always available when factor weights are involved
-        # and the weights are already properly aggregated
-        if 'Weight' in base_query.columns:
-            total_value_expr = (base_query.Quantity * base_query.Price * base_query.Weight).sum().name("Total")
-        else:
-            total_value_expr = (base_query.Quantity * base_query.Price).sum().name("Total")
-
-        total_value_subquery = total_value_expr.as_scalar()
-
-        if verbose:
-            print("Total Value Query --------------------------------")
-            print(ibis.to_sql(total_value_subquery))
-
-        return total_value_subquery  # Not executed yet, will be used in expression
-
     def _add_aggregates(
         self,
         query: ibis.Table,
         dimensions: List[str],
-        metrics: List[str],
-        verbose = False
+        metrics: List[str]
     ) -> ibis.Table:
         """Add aggregate expressions to the query using a GROUP BY if required.
 
@@ -458,7 +1000,6 @@ class MetricsMixin:
             query: Query to add aggregates to
             dimensions: List of dimensions to group by
             metrics: List of metrics to add aggregates for
-            verbose: If True, print the generated SQL query. Default is False.
         """
         agg_exprs = []
         if 'Quantity' in metrics:
@@ -466,19 +1007,14 @@ class MetricsMixin:
             agg_exprs.append(query.Quantity.sum().name("Quantity"))
 
         if 'Value' in metrics or 'Allocation' in metrics:
-            # Use Weight if it's available (means factor weights were pre-aggregated)
-            if 'Weight' in query.columns:
-                agg_exprs.append((query.Quantity * query.Price * query.Weight).sum().name("Value"))
-            else:
-                agg_exprs.append((query.Quantity * query.Price).sum().name("Value"))
+            # Value is already weighted when factor weights are involved
+            agg_exprs.append(query.Value.sum().name("Value"))
 
         # If no dimensions, just apply aggregates directly
         if not dimensions:
             query = query.aggregate(agg_exprs)
-            if verbose:
-                print("Grouped Query --------------------------------")
-                print("   No dimensions specified, no GROUP BY")
-                print(ibis.to_sql(query))
+            logger.debug("No dimensions specified, no GROUP BY")
+            _debug_sql("Grouped Query", query)
             return query
 
         # Otherwise group by dimensions first
@@ -488,7 +1024,7 @@ class MetricsMixin:
             raise ValueError(f"Requested dimensions not found in query: {missing_dims}. "
                            f"Available columns: {list(query.columns)}")
 
-        group_exprs = [getattr(query, dim) for dim in dimensions]
+        group_exprs = [query[dim] for dim in dimensions]
         # Don't overwrite query with grouped table -
         # grouped table can't be used for other query building operations
         grouped = query.group_by(group_exprs)
@@ -496,46 +1032,324 @@ class MetricsMixin:
         # Add aggregates to grouped table - returns a query
         grouped_query = grouped.aggregate(agg_exprs)
 
-        if verbose:
-            print("Grouped Query --------------------------------")
-            print(ibis.to_sql(grouped_query))
+        _debug_sql("Grouped Query", grouped_query)
 
         return grouped_query
 
     def _add_allocation(
         self,
-        query: ibis.Table,
-        total_value_subquery: ibis.Table,
-        verbose = False
+        result: pd.DataFrame,
+        total_value: Optional[float] = None
+    ) -> pd.DataFrame:
+        """Add allocation metric to the executed query result.
+
+        The allocation is calculated in-process on the Value column rather than in
+        DuckDB so that large per-position results avoid a second pass over the data.
+
+        Args:
+            result: The executed query result (with a Value column) to add allocation to
+            total_value: Total value used for allocation calculation. If None, the sum
+                         of the Value column is used (i.e. the filtered portfolio value).
+
+        Returns:
+            The result with an Allocation column added
+        """
+        logger.debug("Allocation total value: %s",
+                     total_value if total_value is not None else 'sum of Value')
+
+        result['Allocation'] = _compute_allocations(result['Value'].to_numpy(), total_value)
+
+        return result
+
+    def _compile_sql(self, expr: ibis.Expr) -> str:
+        """Compile an ibis expression to DuckDB SQL, reusing previously compiled SQL.
+
+        ibis expressions are structurally hashable, so repeated getMetrics calls with
+        the same dimensions, metrics and filters build an equal expression and reuse
+        the SQL compiled for the first call. The generated SQL only depends on table
+        names and schemas, not the registered data, so cached SQL remains valid
+        when tables are re-registered.
+
+        Args:
+            expr: Expression to compile
+
+        Returns:
+            SQL string for the expression
+        """
+        cache = getattr(self, '_sql_cache', None)
+        if cache is None:
+            cache = self._sql_cache = OrderedDict()
+
+        key = expr.op()
+        sql = cache.get(key)
+        if sql is not None:
+            cache.move_to_end(key)
+            return sql
+
+        sql = ibis.to_sql(expr, dialect='duckdb')
+        cache[key] = sql
+        if len(cache) > SQL_CACHE_SIZE:
+            cache.popitem(last=False)
+        return sql
+
+    def _execute_query(self, query: ibis.Table) -> pd.DataFrame:
+        """Execute a query and convert the result to a pandas DataFrame.
+
+        The result is streamed from DuckDB as Arrow record batches and converted
+        with split_blocks and self_destruct so that Arrow buffers are released
+        as the pandas blocks are built, rather than holding both full copies of
+        the result in memory at once.
+
+        Args:
+            query: Query to execute
+
+        Returns:
+            DataFrame containing the query result
+        """
+        schema = query.schema().to_pyarrow()
+        cursor = self._get_connection().raw_sql(self._compile_sql(query))
+        reader = cursor.fetch_record_batch(RESULT_BATCH_SIZE)
+        batches = iter(reader)
+        if not reader.schema.equals(schema):
+            # Cast each batch to the query schema - DuckDB returns some aggregates with
+            # wider types than ibis reports (e.g. SUM of BIGINT is HUGEINT)
+            batches = (batch.cast(schema) for batch in batches)
+        table = pa.Table.from_batches(batches, schema=schema)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def _get_pandas_metrics(
+        self,
+        name: str,
+        fact_table: pd.DataFrame,
+        dimensions: List[str],
+        metrics: List[str],
+        filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None,
+        portfolio_allocation: bool = False
+    ) -> Tuple[pd.DataFrame, Optional[float]]:
+        """Calculate metrics from a pre-joined fact table with pandas.
+
+        Used for metrics grouped and filtered only by holdings dimensions (which
+        only need the valued holdings table) and for fact tables smaller than
+        metrics_duckdb_threshold rows. For these a pandas groupby on the cached
+        table is faster than building, compiling and executing a DuckDB query.
+
+        Factor table rows are summed directly using their Weighted Value.
+        This matches the factor weight pre-aggregation of the DuckDB query as long
+        as each position has at most one row per factor (see _has_unique_factor_rows).
+
+        Args:
+            name: Name of the fact table (see _get_portfolio_total)
+            fact_table: Fact table (holdings_valued or a holdings_factors table)
+            dimensions: Dimensions to group by
+            metrics: List of metrics to calculate ('Quantity', 'Value', 'Allocation')
+            filters: Dictionary of filters (see getMetrics)
+            portfolio_allocation: Whether allocations are relative to the total portfolio
+
+        Returns:
+            Tuple of a DataFrame with the dimension columns and the Quantity and/or
+            Value columns, and the portfolio total value (None unless filtered
+            allocations are relative to the total portfolio)
+
+        Raises:
+            ValueError: If a dimension or filter is not a column of the fact table
+        """
+        _check_columns(fact_table.columns, dimensions, filters)
+
+        aggregates = []
+        if 'Quantity' in metrics:
+            aggregates.append('Quantity')
+        if 'Value' in metrics or 'Allocation' in metrics:
+            aggregates.append('Value')
+
+        # Total of the whole portfolio - calculated before the filters are applied
+        total_value = None
+        if filters and portfolio_allocation and 'Allocation' in metrics:
+            total_value = self._get_portfolio_total(name, fact_table)
+
+        # Only the dimension and aggregate columns are needed, so only those are
+        # filtered - the factor tables sum the weighted values (a dimension can't
+        # be Value - it is always aggregated)
+        value_column = 'Weighted Value' if 'Weighted Value' in fact_table.columns else 'Value'
+        columns = {col: fact_table[value_column if col == 'Value' else col].array
+                   for col in dimensions + aggregates}
+
+        if filters:
+            mask = np.ones(len(fact_table), dtype=bool)
+            for dim, values in filters.items():
+                mask &= _filter_mask(fact_table[dim], _filter_values(values))
+            columns = {col: values[mask] for col, values in columns.items()}
+
+        fact_table = pd.DataFrame(columns, copy=False)
+
+        if not dimensions:
+            # Single row of totals - summed per column to keep each column's dtype
+            result = pd.DataFrame({col: [fact_table[col].sum(min_count=1)] for col in aggregates})
+        else:
+            result = _group_sums(fact_table, dimensions, aggregates)
+            if result is None:
+                result = fact_table.groupby(dimensions, sort=True, dropna=False,
+                                            observed=True)[aggregates].sum()
+                result = result.reset_index()
+                # Return the dimensions with the original (not categorical) values
+                for dim in dimensions:
+                    if isinstance(result[dim].dtype, pd.CategoricalDtype):
+                        result[dim] = result[dim].astype(result[dim].cat.categories.dtype)
+
+        return result, total_value
+
+    def _has_unique_factor_rows(self) -> bool:
+        """Check whether the factor tables have at most one row per position and factor.
+
+        The DuckDB query pre-aggregates the factor weights of duplicate rows (see
+        _aggregate_factor_weights), while the pandas calculation sums the rows
+        directly, so pandas is only used when there are no duplicates to merge.
+        The holdings and factor weights loaded by Portfolio are always unique -
+        pandas caches the uniqueness of an index, so this check is cheap.
+
+        Returns:
+            True if the holdings and factor weights indexes are unique
+        """
+        factor_weights = self._load_optional_table('factor_weights')
+        return self.getHoldings().index.is_unique and factor_weights.index.is_unique
+
+    def _get_portfolio_total(self, name: str, df: pd.DataFrame) -> float:
+        """Get the total value of the portfolio from a valued fact table.
+
+        The total is summed in pandas from the cached fact table rather than with a
+        second DuckDB query over the same data, and is memoized until the table
+        changes, so repeated portfolio_allocation queries don't recompute it.
+
+        Args:
+            name: Name of the fact table (holdings_valued or a holdings_factors table)
+            df: Fact table with a Value column and, for the factor tables, a
+                Weighted Value column
+
+        Returns:
+            The total value (NaN for an empty portfolio)
+        """
+        cache = getattr(self, '_total_value_cache', None)
+        if cache is None:
+            cache = self._total_value_cache = {}
+
+        cached = cache.get(name)
+        if cached is not None and cached[0] is df:
+            return cached[1]
+
+        # Summing the weighted value of each factor row equals the sum of the
+        # position values weighted by their pre-aggregated factor weights
+        values = df['Weighted Value'] if 'Weighted Value' in df.columns else df['Value']
+        # min_count=1 gives NaN for an empty portfolio, like SQL SUM
+        total_value = values.sum(min_count=1)
+
+        cache[name] = (df, total_value)
+        return total_value
+
+    def _get_metrics_query(
+        self,
+        tables: Dict[str, ibis.Table],
+        dimensions: List[str],
+        metrics: List[str],
+        filter_tables: Dict[str, ibis.Table],
+        requires_factor_weights: bool,
+        requires_factor_levels: bool
     ) -> ibis.Table:
-        """Add allocation metric to the query.
+        """Get the metrics query for a getMetrics call.
+
+        The filter values are bound through the filter tables, so the query only
+        depends on the dimensions, aggregates and filtered dimensions.
+        Built queries are cached on those until any base table is re-registered.
 
         Args:
-            query: The query (with aggregations) to add allocation metric to
-            total_value_subquery: Subquery that provides the total value used for allocation calculation
-            verbose: If True, print the generated SQL query. Default is False.
+            tables: Dict of ibis tables (see _get_base_tables)
+            dimensions: List of dimensions to group by
+            metrics: List of metrics to calculate
+            filter_tables: Dict mapping filtered dimensions to their value tables
+            requires_factor_weights: Whether the factor weights are needed
+            requires_factor_levels: Whether the factor levels are needed
+
+        Returns:
+            The metrics query
         """
-        # Get value column from final query
-        value_col = query.Value.name('Value')
+        cache = getattr(self, '_metrics_query_cache', None)
+        if cache is None:
+            cache = self._metrics_query_cache = OrderedDict()
+
+        # Key on the aggregates the query calculates rather than the requested
+        # metrics - e.g. Value and Allocation both only need the Value sum
+        key = (tuple(dimensions), 'Quantity' in metrics, 'Value' in metrics or 'Allocation' in metrics,
+               tuple(filter_tables))
+        metrics_query = cache.get(key)
+        if metrics_query is not None:
+            logger.debug("Using cached metrics query")
+            cache.move_to_end(key)
+            return metrics_query
+
+        # Build base query with the filters pushed down (before aggregation)
+        filtered_query = self._build_base_query(tables, dimensions,
+                                                requires_factor_weights, requires_factor_levels,
+                                                filter_tables, push_down_filters=True)
+
+        # Add aggregates to get metrics
+        metrics_query = self._add_aggregates(filtered_query, dimensions, metrics)
+
+        _debug_sql("Final Metrics Query", metrics_query)
 
-        # Build allocation expression
-        # - total_value_query is a scalar subquery, so we can divide directly
-        # - we need to use a subquery to ensure the total value is calculated once
-        allocation_expr = (value_col / total_value_subquery).name("Allocation")
+        cache[key] = metrics_query
+        if len(cache) > SQL_CACHE_SIZE:
+            cache.popitem(last=False)
+        return metrics_query
 
-        final_query = query.mutate(Allocation=allocation_expr)
+    def _get_memoized_result(self, key: tuple, fact_table: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Get a copy of the memoized result of a getMetrics call.
 
-        if verbose:
-            print("Allocation Query --------------------------------")
-            print(ibis.to_sql(final_query))
+        Args:
+            key: getMetrics arguments (fact table name, dimensions, metrics, filters
+                 and portfolio_allocation)
+            fact_table: Current fact table the metrics are calculated from
+
+        Returns:
+            Copy of the memoized result, or None if the call has not been memoized
+            or the fact table has changed since
+        """
+        cache = getattr(self, '_metrics_result_cache', None)
+        if cache is None:
+            cache = self._metrics_result_cache = OrderedDict()
+
+        cached = cache.get(key)
+        if cached is None or cached[0] is not fact_table:
+            return None
+        cache.move_to_end(key)
+        # Callers may modify the result they get
+        return cached[1].copy()
+
+    def _memoize_result(self, key: tuple, fact_table: pd.DataFrame, result: pd.DataFrame) -> pd.DataFrame:
+        """Memoize the result of a getMetrics call until its fact table changes.
+
+        Args:
+            key: getMetrics arguments (see _get_memoized_result)
+            fact_table: Fact table the metrics were calculated from
+            result: Result to memoize
+
+        Returns:
+            Copy of the result for the caller
+        """
+        cache = self._metrics_result_cache
 
-        return final_query
+        # A changed fact table means the data was refreshed - drop all results
+        # calculated from the previous data so they don't keep old tables in memory
+        if any(k[0] == key[0] and table is not fact_table for k, (table, _) in cache.items()):
+            cache.clear()
+
+        cache[key] = (fact_table, result)
+        if len(cache) > RESULT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result.copy()
 
     def getMetrics(
         self,
         *dimensions: str,
         metrics: Optional[List[str]] = None,
-        filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+        filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None,
         portfolio_allocation: bool = False,
         verbose: bool = False
     ) -> pd.DataFrame:
@@ -546,63 +1360,102 @@ class MetricsMixin:
             metrics: List of metrics to include ('Quantity', 'Value', 'Allocation').
                     If None, includes all metrics.
             filters: Dictionary of filters to apply. Keys are dimension names, values are
-                    lists of values to include (single values should be in a list).
-                    Example: {'Account': ['IRA', '401k'], 'Level_0': ['Equity']}
+                    a single value or any iterable (list, tuple, set, ...) of values to include.
+                    Example: {'Account': ['IRA', '401k'], 'Level_0': 'Equity'}
             portfolio_allocation: If True, calculate allocations relative to total portfolio value
                                 If False, calculate relative to filtered portfolio value (default)
-            verbose: If True, print the generated SQL query. Default is False.
+            verbose: If True, print the generated SQL queries. Default is False.
+                    The queries are logged at DEBUG level by this module's logger,
+                    so they can also be captured with standard logging configuration.
 
         Returns:
             DataFrame indexed by the specified dimensions with requested metrics as columns
         """
-        # Default metrics if no metrics provided
-        if not metrics:
-            if verbose:
-                print("No metrics specified, using default metrics: Quantity, Value, Allocation")
-            metrics = ['Quantity', 'Value', 'Allocation']
-
-        # Get base tables
-        tables = self._get_base_tables(dimensions, filters)
-
-        # Build base query
-        # - save this to be used for allocation calculation
-        unfiltered_query = self._build_base_query(tables, dimensions, filters, verbose)
-
-        # Apply filters to get filtered query (before aggregation)
-        # - save this to be used for allocation calculation
-        filtered_query = self._apply_filters(unfiltered_query, filters, verbose)
-
-        # Add aggregates to get metrics
-        metrics_query = self._add_aggregates(filtered_query, dimensions, metrics, verbose)
-
-        # Add allocation if requested
-        if 'Allocation' in metrics:
-            # Build total value query for allocation calculation
-            # - filtered_query and unfiltered_query have the Price column
-            # - which is required to build the total value query for the allocation calculation
-            total_value_subquery = self._build_total_value_subquery(
-                unfiltered_query,
-                filtered_query,
-                portfolio_allocation,
-                verbose
-            )
-
-            # Add allocation metrics to final query
-            metrics_query = self._add_allocation(
-                query=metrics_query,
-                total_value_subquery=total_value_subquery,
-                verbose=verbose
-            )
-
-        if verbose:
-            print("Final Metrics Query --------------------------------")
-            print(ibis.to_sql(metrics_query))
-
-        # Execute query
-        result = metrics_query.execute()
+        with _verbose_logging(verbose):
+            # Default metrics if no metrics provided
+            if not metrics:
+                logger.debug("No metrics specified, using default metrics: Quantity, Value, Allocation")
+                metrics = ['Quantity', 'Value', 'Allocation']
+
+            # Filter values can be any iterable - read them once
+            if filters:
+                filters = {dim: _filter_values(values) for dim, values in filters.items()}
+
+            if HOLDINGS_DIMENSIONS.issuperset(dimensions) and HOLDINGS_DIMENSIONS.issuperset(filters or ()):
+                # Simple holdings aggregate - skip the DuckDB query
+                name, fact_table = 'holdings_valued', self._get_holdings_valued()
+                use_duckdb = False
+            else:
+                # Determine once if factor tables are needed based on dimensions and filters
+                requires_factor_weights, requires_factor_levels = self._requires_factor_tables(dimensions, filters)
+
+                # Metrics grouped and filtered only by factor columns are calculated from
+                # the factor table joined to the ticker totals, which is smaller but only
+                # keeps the Ticker, Quantity and Value holdings columns
+                by_ticker = all(col == 'Factor' or col.startswith('Level_')
+                                for col in set(dimensions).union(filters or ()))
+
+                # Select the fact table the metrics are calculated from
+                fact_tables = self._get_fact_tables(requires_factor_weights, requires_factor_levels,
+                                                    by_ticker)
+                name = 'holdings_valued'
+                if requires_factor_weights:
+                    name = next((table for table in fact_tables if table != 'holdings_valued'), None)
+                    _check_factor_columns(fact_tables[name].columns if name else None,
+                                          requires_factor_levels)
+                fact_table = fact_tables[name]
+
+                # Small tables are aggregated with pandas - DuckDB's fixed per-query
+                # overhead would dominate
+                use_duckdb = len(fact_table) >= self.metrics_duckdb_threshold \
+                    or (requires_factor_weights and not self._has_unique_factor_rows())
+
+            # Check the dimensions and filters up front, so the pandas calculation and
+            # the DuckDB query accept the same arguments and raise the same errors
+            _check_columns(fact_table.columns, dimensions, filters)
+
+            # Repeated calls return the memoized result until the fact table changes
+            key = (name, dimensions, tuple(metrics),
+                   tuple((dim, tuple(values)) for dim, values in (filters or {}).items()),
+                   bool(portfolio_allocation))
+            result = self._get_memoized_result(key, fact_table)
+            if result is not None:
+                logger.debug("Using memoized metrics result")
+                return result
+
+            total_value = None
+            if not use_duckdb:
+                result, total_value = self._get_pandas_metrics(name, fact_table, list(dimensions), metrics,
+                                                               filters, portfolio_allocation)
+            else:
+                # Get base tables
+                tables = self._get_base_tables(requires_factor_weights, requires_factor_levels,
+                                               by_ticker)
+
+                # Bind the filter values and get the (possibly cached) query
+                filter_tables = self._register_filters(filters, fact_table)
+                metrics_query = self._get_metrics_query(
+                    tables, dimensions, metrics, filter_tables,
+                    requires_factor_weights, requires_factor_levels
+                )
+
+                # Execute query
+                result = self._execute_query(metrics_query)
+
+                # The filtered total is the sum of the Value column, so the portfolio
+                # total is only needed when allocating filtered results against the
+                # whole portfolio - without filters both totals are the same
+                if filters and portfolio_allocation and 'Allocation' in metrics:
+                    total_value = self._get_portfolio_total(name, fact_table)
+
+            # Add allocation if requested
+            if 'Allocation' in metrics:
+                # Without a portfolio total the total is the sum of the Value
+                # column (i.e. the filtered portfolio value)
+                result = self._add_allocation(result, total_value)
 
         # Set index based on dimensions if any were specified
         if dimensions:
             result.set_index(list(dimensions), inplace=True)
 
-        return result
+        return self._memoize_result(key, fact_table, result)
@@ -29,14 +29,16 @@ Dependencies:
 """
 
 import pandas as pd
+import numpy as np
 import os
-from typing import Dict
+from typing import Dict, Optional
 
-from .holdings import load_and_consolidate_holdings
+from .holdings import load_and_consolidate_holdings, holdings_cache_key
 from .account import load_account_dimension
+from .config import default_config
 from .factor import load_factor_dimension
-from .factor import load_factor_weights
-from .market_data import get_latest_ticker_prices, get_tickers_info
+from .factor import load_factor_weights, factor_weights_cache_key
+from .market_data import get_latest_ticker_prices, get_tickers_info, tickers_cache_key
 from .rebalance import RebalanceMixin
 from .metrics import MetricsMixin
 
@@ -82,12 +84,61 @@ class Portfolio(RebalanceMixin, MetricsMixin):
 
         # Initialize cache
         self._holdings_cache = None
+        self._unique_tickers = None
         self._accounts_cache = None
         self._prices_cache = None
         self._factors_cache = None
         self._factor_weights_cache = None
         self._tickers_cache = None
 
+        # Capability flags for the optional factor tables - these are checked
+        # once here so that metrics calculations don't repeatedly attempt to load
+        # data sources that are not configured. The factors are loaded from the
+        # default configuration when no configuration is given, and can't be
+        # loaded from an empty hierarchy.
+        hierarchy = (config if config is not None else default_config()).get('asset_class_hierarchy')
+        self._has_factors = bool(hierarchy)
+        self._has_factor_weights = factor_weights_file is not None and self._has_factors
+
+        # DuckDB connection used for metrics calculations - created on first use
+        self._con = None
+        self._ibis_tables = {}
+
+    def close(self) -> None:
+        """
+        Release the DuckDB connection used for metrics calculations.
+
+        Cached portfolio data is kept. The connection is re-opened automatically
+        the next time metrics are calculated.
+        """
+        self._close_connection()
+
+    def __enter__(self) -> 'Portfolio':
+        """
+        Use the portfolio as a context manager that closes the DuckDB connection on exit.
+
+        Example:
+            with Portfolio(config, factor_weights_file, holdings_dir) as portfolio:
+                metrics = portfolio.getMetrics('Level_0')
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Close the DuckDB connection. Exceptions raised in the with block propagate.
+        """
+        self.close()
+
+    def __del__(self):
+        """
+        Close the DuckDB connection when the portfolio is garbage collected.
+        """
+        try:
+            self._close_connection()
+        except Exception:
+            # The connection may already be gone during interpreter shutdown
+            pass
+
     def getHoldings(self, forceRefresh: bool = False, verbose: bool = False) -> pd.DataFrame:
         """
         Get consolidated holdings data across all accounts.
@@ -97,18 +148,81 @@ class Portfolio(RebalanceMixin, MetricsMixin):
             verbose: If True, print status messages. Default is False.
 
         Returns:
-            DataFrame with hierarchical index [Ticker, Account Name] containing:
+            DataFrame with hierarchical index [Ticker, Account Name], sorted by Ticker, containing:
             - Quantity
             - Original Value
         """
         if forceRefresh or self._holdings_cache is None:
-            self._holdings_cache = load_and_consolidate_holdings(
-                *self.holdings_files,
-                config=self.config,
+            # Use the on-disk parquet cache if it is fresh (holdings files and
+            # configuration are unchanged) to skip parsing the CSV files. The
+            # holdings are sorted by Ticker (like the factor weights) so the
+            # joins on Ticker in the metrics calculations scan clustered keys
+            self._holdings_cache = self._load_cached(
+                'holdings',
+                lambda: holdings_cache_key(*self.holdings_files, config=self.config),
+                lambda: load_and_consolidate_holdings(
+                    *self.holdings_files,
+                    config=self.config,
+                    verbose=verbose
+                ).sort_index(level='Ticker', sort_remaining=False),
+                forceRefresh=forceRefresh,
                 verbose=verbose
             )
+
+            # Unique tickers used to load prices and ticker information
+            self._unique_tickers = self._holdings_cache.index.unique(level='Ticker')
         return self._holdings_cache
 
+    def _load_cached(self, name: str, key, load, forceRefresh: bool = False,
+                     verbose: bool = False) -> pd.DataFrame:
+        """
+        Load a DataFrame through the on-disk parquet cache.
+
+        The cache file is named from the data set name and a key that identifies
+        its inputs (see _get_cache_path), so changed inputs result in a new cache
+        file rather than a stale read. Without a configured cache_dir the data is
+        always loaded from its source.
+
+        Args:
+            name: Name of the cached data set (e.g. 'holdings', 'prices')
+            key: Callable returning the cache key for the current inputs
+            load: Callable that loads the DataFrame from its source
+            forceRefresh: If True, ignore an existing cache file and overwrite it. Default is False.
+            verbose: If True, print status messages. Default is False.
+
+        Returns:
+            The cached or freshly loaded DataFrame
+        """
+        cache_path = self._get_cache_path(name, key)
+        if not forceRefresh and cache_path is not None and os.path.exists(cache_path):
+            if verbose:
+                print(f"Loading {name} from cache: {cache_path}")
+            return pd.read_parquet(cache_path)
+
+        data = load()
+        if cache_path is not None:
+            if verbose:
+                print(f"Writing {name} to cache: {cache_path}")
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            data.to_parquet(cache_path)
+        return data
+
+    def _get_cache_path(self, name: str, key) -> Optional[str]:
+        """
+        Get the path of the parquet file used to cache a data set.
+
+        Args:
+            name: Name of the cached data set
+            key: Callable returning the cache key, only called if caching is enabled
+
+        Returns:
+            Path to the cache file or None if no cache_dir is configured
+        """
+        cache_dir = self.config.get('cache_dir') if self.config else None
+        if not cache_dir:
+            return None
+        return os.path.join(os.path.expanduser(cache_dir), f"{name}_{key()}.parquet")
+
     def getAccounts(self, forceRefresh: bool = False) -> pd.DataFrame:
         """
         Get account dimension data.
@@ -140,12 +254,19 @@ class Portfolio(RebalanceMixin, MetricsMixin):
             - Price
         """
         if forceRefresh or self._prices_cache is None:
-            # Get holdings to extract unique tickers
-            holdings = self.getHoldings(verbose=verbose)
-            tickers = holdings.index.get_level_values('Ticker').unique()
-
-            # Get latest prices for all tickers
-            self._prices_cache = get_latest_ticker_prices(tickers, verbose=verbose)
+            # Load holdings to get the unique tickers
+            self.getHoldings(verbose=verbose)
+            tickers = self._unique_tickers
+
+            # Get latest prices for all tickers - prices cached on disk are
+            # reused for the rest of the day without calling the market data service
+            self._prices_cache = self._load_cached(
+                'prices',
+                lambda: tickers_cache_key(tickers),
+                lambda: get_latest_ticker_prices(tickers, verbose=verbose),
+                forceRefresh=forceRefresh,
+                verbose=verbose
+            )
 
         return self._prices_cache
 
@@ -187,9 +308,11 @@ class Portfolio(RebalanceMixin, MetricsMixin):
                 raise ValueError("Factor weights file not provided.")
 
             # Load factor weights
-            self._factor_weights_cache = load_factor_weights(
-                self.factor_weights_file,
-                factors
+            self._factor_weights_cache = self._load_cached(
+                'factor_weights',
+                lambda: factor_weights_cache_key(self.factor_weights_file, config=self.config),
+                lambda: load_factor_weights(self.factor_weights_file, factors),
+                forceRefresh=forceRefresh
             )
         return self._factor_weights_cache
 
@@ -211,12 +334,18 @@ class Portfolio(RebalanceMixin, MetricsMixin):
             Note: Some fields may be NaN if not available for a particular security
         """
         if forceRefresh or self._tickers_cache is None:
-            # Get holdings to extract unique tickers
-            holdings = self.getHoldings(verbose=verbose)
-            tickers = holdings.index.get_level_values('Ticker').unique()
-
-            # Get ticker information from Yahoo Finance
-            self._tickers_cache = get_tickers_info(tickers, verbose=verbose)
+            # Load holdings to get the unique tickers
+            self.getHoldings(verbose=verbose)
+            tickers = self._unique_tickers
+
+            # Get ticker information from Yahoo Finance (cached on disk for the day)
+            self._tickers_cache = self._load_cached(
+                'tickers',
+                lambda: tickers_cache_key(tickers),
+                lambda: get_tickers_info(tickers, verbose=verbose),
+                forceRefresh=forceRefresh,
+                verbose=verbose
+            )
 
         return self._tickers_cache
 
@@ -238,8 +367,8 @@ class Portfolio(RebalanceMixin, MetricsMixin):
             # Get pairs for specific accounts
             ira_pairs = portfolio.getAccountTickers(accounts=['IRA', 'Roth IRA'])
         """
-        # Get holdings to extract Account-Ticker pairs
-        holdings = self.getHoldings(verbose=verbose)
+        # Get holdings index to extract Account-Ticker pairs
+        pairs = self.getHoldings(verbose=verbose).index
 
         # Filter by accounts if specified
         if accounts is not None:
@@ -247,14 +376,18 @@ class Portfolio(RebalanceMixin, MetricsMixin):
             if isinstance(accounts, str):
                 accounts = [accounts]
 
-            # Filter holdings to only include specified accounts
-            holdings = holdings[holdings.index.get_level_values('Account').isin(accounts)]
+            # Filter the index rather than the holdings - match the accounts against
+            # the unique Account level values and map the matches to the rows through
+            # the level codes (a code of -1 is a missing account and never matches)
+            level = pairs.names.index('Account')
+            matches = np.append(pairs.levels[level].isin(accounts), False)
+            pairs = pairs[matches[pairs.codes[level]]]
 
             if verbose:
                 print(f"Filtered to {len(accounts)} accounts: {', '.join(accounts)}")
 
         # Create DataFrame with Account-Ticker pairs from holdings index
-        account_tickers = pd.DataFrame(index=holdings.index)
+        account_tickers = pd.DataFrame(index=pairs)
 
         if verbose:
             print(f"Found {len(account_tickers)} account-ticker pairs")
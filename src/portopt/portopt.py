@@ -1,10 +1,17 @@
 import pandas as pd
+import numpy as np
 import cvxpy as cp
 import argparse
-import math
 import yfinance as yf
 import os
-from contextlib import redirect_stderr
+import io
+import sys
+import functools
+import itertools
+import tempfile
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 
 from .utils import write_table
 
@@ -17,6 +24,33 @@ ASSET_CLASS_TARGETS = "asset_class_targets"
 FUND_ALLOCATIONS = "fund_allocations"
 ASSET_CLASS_ALLOCATIONS = "asset_class_allocations"
 OPT_PROBLEM = "opt_problem"
+OPT_STATUS = "opt_status"
+OPT_VALUE = "opt_value"
+SPARSITY_WEIGHT = "sparsity_weight"
+MIN_ALLOC = "min_alloc"
+MAX_FUNDS = "max_funds"
+
+# column formats of the fund allocations table
+FUND_COLUMNS = {
+    'Ticker': {'width': 10},
+    'Name': {'width': 50},
+    'Price': {'width': 10, 'decimal': 3, 'prefix': '$'},
+    'Allocation': {'width': 10, 'type': '%', 'decimal': 2}
+}
+
+# column formats of the asset class allocations table
+ALLOC_COLUMNS = {
+    'Asset Class': {'width': 20},
+    'Actual': {'width': 10, 'type': '%', 'decimal': 2},
+    'Target': {'width': 10, 'type': '%', 'decimal': 2},
+    'Diff': {'width': 10, 'type': '%', 'decimal': 2}
+}
+
+# maximum number of concurrent Yahoo! Finance requests
+MAX_FUND_INFO_REQUESTS = 16
+
+# optimization problems by (num funds, num asset classes, has integers, has max funds) - see _get_problem
+_problem_cache = {}
 
 def main():
     # Set up argument parser
@@ -61,6 +95,20 @@ def main():
         help="Optional subset of accounts to process " + \
              "(default: None - process all accounts)."
     )
+    parser.add_argument(
+        "-j", # number of parallel jobs
+        type=int,
+        default=None,
+        help="Optional number of accounts to optimize in parallel " + \
+             "(default: None - one process per CPU)."
+    )
+    parser.add_argument(
+        "-c", # cache directory
+        type=str,
+        default=None,
+        help="Optional directory used to cache fund names and prices for the day " + \
+             "(default: None - no cache)."
+    )
     parser.add_argument(
         "-v", # verbose
         default=False,
@@ -84,7 +132,32 @@ def main():
     # iterate over accounts:
     # - generate optimal portfolio
     # - output the results
-    for account_name in accounts:
+    # accounts are independent so they are optimized in parallel processes
+    # and their output is printed in order as it becomes available
+    max_workers = min(len(accounts), args.j or os.cpu_count() or 1)
+    if max_workers <= 1:
+        for account_name in accounts:
+            print(optimize_account(data, account_name, args), end="")
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outputs = executor.map(optimize_account,
+                                   [data] * len(accounts), accounts, [args] * len(accounts))
+            for output in outputs:
+                print(output, end="")
+
+def optimize_account(data, account_name, args):
+    """
+    Generate the optimal portfolio for an account and return the output.
+
+    Args:
+        data (DataFrame): fund and target allocations loaded by load_data
+        account_name (string): account to optimize (None if the data has no accounts)
+        args (Namespace): parsed command-line arguments
+
+    Returns:
+        string: the results as printed by output_results
+    """
+    with redirect_stdout(io.StringIO()) as output:
         # extract the matrices and vectors
         account_data = extract_data(data, account_name, args.f, args.v)
 
@@ -92,16 +165,18 @@ def main():
         results = opt_port(account_data, args.sw, args.mf, args.ma, args.v)
 
         # output the results
-        output_results(results)
+        output_results(results, args.c)
 
-def output_results(data):
+    return output.getvalue()
+
+def output_results(data, cache_dir=None):
     account_name          = data[ACCOUNT_NAME]
     fund_allocations      = data[FUND_ALLOCATIONS]
     portfolio_allocations = data[ASSET_CLASS_ALLOCATIONS]
     target_allocations    = data[ASSET_CLASS_TARGETS]
     fund_tickers          = data[TICKERS]
     asset_classes         = data[ASSET_CLASSES]
-    problem               = data[OPT_PROBLEM]
+    status                = data[OPT_STATUS]
 
     # Output account name
     if (account_name is not None):
@@ -111,98 +186,167 @@ def output_results(data):
         print(f"{line}")
 
     # Output optimal fund allocations
-    if (fund_allocations.value is not None):
+    if (fund_allocations is not None):
         # fill in name and price for the funds
-        for ticker in fund_tickers.index:
-            name, price = get_fund_info(ticker)
-            fund_tickers.loc[ticker, "Name"] = name
-            fund_tickers.loc[ticker, "Price"] = price
+        fund_info = get_funds_info(fund_tickers.index, cache_dir)
 
         print("\nOPTIMAL FUND ALLOCATIONS:")
         print("==========================\n")
 
         # Create DataFrame for fund allocations
-        fund_df = fund_tickers.copy()
-        fund_df['Allocation'] = fund_allocations.value
-
-        # Define column formats
-        fund_columns = {
-            'Ticker': {'width': 10},
-            'Name': {'width': 50},
-            'Price': {'width': 10, 'decimal': 3, 'prefix': '$'},
-            'Allocation': {'width': 10, 'type': '%', 'decimal': 2}
-        }
+        fund_df = fund_tickers.assign(
+            Name=[name for name, _ in fund_info],
+            Price=[price for _, price in fund_info],
+            Allocation=fund_allocations
+        )
 
-        write_table(fund_df, columns=fund_columns)
+        write_table(fund_df, columns=FUND_COLUMNS, stream=sys.stdout)
 
     # Output portfolio allocations
-    if (portfolio_allocations.value is not None):
+    if (portfolio_allocations is not None):
         print("\nPORTFOLIO ASSET CLASS ALLOCATIONS:")
         print("===================================\n")
 
         # Create DataFrame for asset allocations
         alloc_df = pd.DataFrame({
             'Asset Class': asset_classes,
-            'Actual': portfolio_allocations.value,
+            'Actual': portfolio_allocations,
             'Target': target_allocations,
-            'Diff': target_allocations - portfolio_allocations.value
+            'Diff': target_allocations - portfolio_allocations
         })
 
-        # Define column formats
-        alloc_columns = {
-            'Asset Class': {'width': 20},
-            'Actual': {'width': 10, 'type': '%', 'decimal': 2},
-            'Target': {'width': 10, 'type': '%', 'decimal': 2},
-            'Diff': {'width': 10, 'type': '%', 'decimal': 2}
-        }
-
-        write_table(alloc_df, columns=alloc_columns)
+        write_table(alloc_df, columns=ALLOC_COLUMNS, stream=sys.stdout)
 
     # output solver information
-    if (problem is not None):
-        print(f"\nSolver Status: {problem.status}")
-        print(f"Objective Value (total deviation): {problem.value}\n")
+    if (status is not None):
+        print(f"\nSolver Status: {status}")
+        print(f"Objective Value (total deviation): {data[OPT_VALUE]}\n")
 
 def opt_port(data, sparsity_weight=0.0, max_funds=None, min_alloc=0.0, verbose=False):
 
     fund_matrix = data[FUND_MATRIX]
     target_allocations = data[ASSET_CLASS_TARGETS]
 
+    # The binary selection variables are only needed for the sparsity penalty,
+    # the maximum number of funds and the minimum fund allocation - without
+    # them the problem is a QP that is solved much faster than the MIQP
+    has_integers = sparsity_weight != 0 or max_funds is not None or min_alloc > 0
+
+    # Get the problem for the shape of the data and set its parameters - the
+    # problem is compiled on the first solve and re-used for later accounts
+    num_funds, num_classes = fund_matrix.shape
+    opt = _get_problem(num_funds, num_classes, has_integers, max_funds is not None)
+    opt[FUND_MATRIX].value = fund_matrix.T
+    opt[ASSET_CLASS_TARGETS].value = target_allocations
+
+    problem = opt[OPT_PROBLEM]
+    if has_integers:
+        opt[SPARSITY_WEIGHT].value = sparsity_weight
+        opt[MIN_ALLOC].value = min_alloc
+        if max_funds is not None:
+            opt[MAX_FUNDS].value = max_funds
+
+        # Solve the problem using SCIP solver (supports MIQP)
+        problem.solve(solver=cp.SCIP, verbose=verbose)
+    else:
+        # Solve the QP using OSQP warm started from the previous account
+        problem.solve(solver=cp.OSQP, warm_start=True, verbose=verbose)
+
+        # OSQP satisfies x >= 0 to within its tolerance - clip the tiny
+        # negative allocations of unused funds
+        x = opt[FUND_ALLOCATIONS]
+        if x.value is not None:
+            x.value = np.maximum(x.value, 0)
+
+    # The variables are shared by every account solved with the same problem,
+    # so copy the results before the next account is solved
+    fund_allocations = opt[FUND_ALLOCATIONS].value
+    portfolio_allocations = opt[ASSET_CLASS_ALLOCATIONS].value
+    data[FUND_ALLOCATIONS] = None if fund_allocations is None else fund_allocations.copy()
+    data[ASSET_CLASS_ALLOCATIONS] = None if portfolio_allocations is None else portfolio_allocations.copy()
+    data[OPT_STATUS] = problem.status
+    data[OPT_VALUE] = problem.value
+
+    return data
+
+def _get_problem(num_funds, num_classes, has_integers, has_max_funds):
+    """
+    Get the optimization problem for a fund matrix shape.
+
+    The fund matrix, targets and penalties are CVXPY parameters, so the
+    problem is built once per shape and CVXPY re-uses its compiled form when
+    the problem is solved again with new parameter values.
+
+    Args:
+        num_funds (int): number of funds (rows of the fund matrix)
+        num_classes (int): number of asset classes (columns of the fund matrix)
+        has_integers (bool): whether the problem has the binary fund selection
+          variables used by the sparsity penalty and fund count and minimum
+          allocation constraints
+        has_max_funds (bool): whether the problem limits the number of funds
+
+    Returns:
+        dict holding the problem, its parameters and its result expressions
+    """
+    key = (num_funds, num_classes, has_integers, has_max_funds)
+    opt = _problem_cache.get(key)
+    if opt is not None:
+        return opt
+
+    # The fund matrix parameter holds the transposed fund matrix (asset classes
+    # x funds) so that the portfolio allocation is a plain matrix product
+    fund_matrix = cp.Parameter((num_classes, num_funds))
+    target_allocations = cp.Parameter(num_classes)
+
     # Define the optimization problem
-    num_funds = fund_matrix.shape[0]
     x = cp.Variable(num_funds)  # Allocation to each fund
-    z = cp.Variable(num_funds, boolean=True)  # Binary selection variables
 
     # Resulting portfolio allocation
-    portfolio_allocations = fund_matrix.T @ x
+    portfolio_allocations = fund_matrix @ x
 
-    # Objective: Minimize squared difference + sparsity penalty
-    objective = cp.Minimize(
-        cp.sum_squares(portfolio_allocations - target_allocations)
-        + sparsity_weight * cp.sum(z) # Penalize the number of funds
-    )
+    # Deviation from the target allocations - an auxiliary variable keeps the
+    # fund matrix out of the quadratic objective, which is much smaller for
+    # the solver than the expanded sum of squares
+    deviation = cp.Variable(num_classes)
+
+    # Objective: Minimize squared difference
+    objective = cp.sum_squares(deviation)
 
     # Constraints
     constraints = [
+        deviation == portfolio_allocations - target_allocations,
         cp.sum(x) == 1,  # Allocations must sum to 100%
         x >= 0,          # No negative allocation
-        x >= min_alloc *z, # Positive fund allocations must be greater than min_alloc
-        x <= z,          # Link x and z (if z=0, x=0)
     ]
 
-    # Add maximum funds constraint if specified
-    if max_funds is not None:
-        constraints.append(cp.sum(z) <= max_funds)
+    opt = {
+        FUND_MATRIX: fund_matrix,
+        ASSET_CLASS_TARGETS: target_allocations,
+        FUND_ALLOCATIONS: x,
+        ASSET_CLASS_ALLOCATIONS: portfolio_allocations,
+    }
+
+    if has_integers:
+        z = cp.Variable(num_funds, boolean=True)  # Binary selection variables
+        opt[SPARSITY_WEIGHT] = cp.Parameter(nonneg=True)
+        opt[MIN_ALLOC] = cp.Parameter(nonneg=True)
 
-    # Solve the problem using SCIP solver (supports MIQP)
-    problem = cp.Problem(objective, constraints)
-    problem.solve(solver=cp.SCIP, verbose=verbose)
+        # Add sparsity penalty to the objective
+        objective = objective + opt[SPARSITY_WEIGHT] * cp.sum(z) # Penalize the number of funds
 
-    data[FUND_ALLOCATIONS] = x
-    data[ASSET_CLASS_ALLOCATIONS] = portfolio_allocations
-    data[OPT_PROBLEM] = problem
+        constraints += [
+            x >= opt[MIN_ALLOC] * z, # Positive fund allocations must be greater than min_alloc
+            x <= z,                  # Link x and z (if z=0, x=0)
+        ]
 
-    return data
+        # Add maximum funds constraint if specified
+        if has_max_funds:
+            opt[MAX_FUNDS] = cp.Parameter(nonneg=True)
+            constraints.append(cp.sum(z) <= opt[MAX_FUNDS])
+
+    opt[OPT_PROBLEM] = cp.Problem(cp.Minimize(objective), constraints)
+    _problem_cache[key] = opt
+    return opt
 
 def load_data(file_path, verbose=False):
     """
@@ -258,49 +402,112 @@ def get_accounts(data, verbose=False):
     if 'Accounts' in data.columns:
         if verbose:
             print(f"get_accounts:\n {data['Accounts']}")
-        # explode() will convert lists in each cell to separate rows
-        # - empty lists are converted to NaN values
-        # dropna() will remove any NaN values
-        # unique() will get unique values across all rows
-        return set(data['Accounts'].explode().dropna().unique())
+        # each cell holds a list of account names (empty if no accounts are
+        # listed) - collect the names directly rather than exploding the column
+        return set(itertools.chain.from_iterable(data['Accounts']))
     else:
         return { None }
 
-def get_price_str(price):
-    if (math.isnan(price)):
-        return "N/A".center(10)
-    else:
-        return f"${price:.3f}  ".rjust(10)
+def get_funds_info(tickers, cache_dir=None, verbose=False):
+    """
+    Retrieve the fund names and last prices for multiple funds from Yahoo! Finance.
+
+    The funds are requested concurrently and each fund is only requested once
+    per process. If a cache directory is provided, the fund information is also
+    saved to a parquet file for the day and funds found in it are not requested
+    again until the next day.
+
+    Args:
+        tickers (iterable): fund ticker symbols
+        cache_dir (string): optional directory holding the fund information cache
+
+    Returns:
+        list of (name, price) tuples in the order of the tickers
+    """
+    tickers = list(tickers)
+
+    # Load the fund information cached earlier in the day
+    cache_path = None
+    cached = {}
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"fund_info_{date.today().isoformat()}.parquet")
+        if os.path.exists(cache_path):
+            cached_df = pd.read_parquet(cache_path)
+            cached = dict(zip(cached_df.index, zip(cached_df['Name'], cached_df['Price'])))
+
+    missing = [ticker for ticker in dict.fromkeys(tickers) if ticker not in cached]
+    if missing:
+        with open(os.devnull, "w") as fnull, redirect_stderr(fnull):
+            with ThreadPoolExecutor(max_workers=min(len(missing), MAX_FUND_INFO_REQUESTS)) as executor:
+                cached.update(zip(missing, executor.map(_fetch_fund_info, missing)))
+
+        if cache_path is not None:
+            _write_fund_info_cache(cache_path, cached)
+
+    return [cached[ticker] for ticker in tickers]
+
+def _write_fund_info_cache(cache_path, fund_info):
+    """
+    Save the fund information to the cache file.
+
+    The file is written to a temporary file that replaces the cache file, so
+    accounts optimized in parallel never read a partially written file (a
+    concurrent update may be lost, in which case the funds are requested again).
+
+    Args:
+        cache_path (string): path of the cache file
+        fund_info (dict): (name, price) tuples by ticker
+    """
+    fund_info_df = pd.DataFrame.from_dict(fund_info, orient='index', columns=['Name', 'Price'])
+    fund_info_df.index.name = 'Ticker'
+    fund_info_df['Price'] = pd.to_numeric(fund_info_df['Price'], errors='coerce')
+
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".parquet")
+    os.close(fd)
+    fund_info_df.to_parquet(temp_path)
+    os.replace(temp_path, cache_path)
 
 def get_fund_info(ticker, verbose=False):
     """
     Retrieve the fund name and last price from Yahoo! Finance
     """
+    with open(os.devnull, "w") as fnull, redirect_stderr(fnull):
+        return _fetch_fund_info(ticker)
+
+@functools.lru_cache(maxsize=None)
+def _fetch_fund_info(ticker):
+    """
+    Retrieve the fund name and last price from Yahoo! Finance.
+
+    Callers redirect stderr - the redirection is process wide so it is not done
+    here, where requests may be running in several threads.
+    """
     price = None
     name = None
 
-    with open(os.devnull, "w") as fnull, redirect_stderr(fnull):
-        # Get the ticker data from Yahoo Finance
-        fund = yf.Ticker(ticker)
+    # Get the ticker data from Yahoo Finance
+    fund = yf.Ticker(ticker)
 
-        # Retrieve the most recent price (current price or bid price if real-time data available)
-        price = fund.info.get("regularMarketPrice", None)
+    # Retrieve the most recent price (current price or bid price if real-time data available)
+    price = fund.info.get("regularMarketPrice", None)
 
-        # Get previous close if real-time price is not available
-        if (price is None):
-            if (ticker.upper().endswith('X')): # mutual funds end with 'X'
-                history_period = "1mo"
-            else:
-                history_period = "1d"
+    # Get previous close if real-time price is not available
+    if (price is None):
+        if (ticker.upper().endswith('X')): # mutual funds end with 'X'
+            history_period = "1mo"
+        else:
+            history_period = "1d"
 
-            history = fund.history(period=history_period, interval="1m")  # Minute-level data for the day
-            if not history.empty:
-                price = history["Close"].iloc[-1]  # Last "Close" price of the fetched data
-            else:
-                price = fund.info.get("regularMarketPreviousClose", None)
+        history = fund.history(period=history_period, interval="1m")  # Minute-level data for the day
+        if not history.empty:
+            price = history["Close"].iloc[-1]  # Last "Close" price of the fetched data
+        else:
+            price = fund.info.get("regularMarketPreviousClose", None)
 
-        # get name
-        name = fund.info.get("longName", "N/A")
+    # get name
+    name = fund.info.get("longName", "N/A")
 
     return name, price
 
@@ -312,7 +519,9 @@ def extract_data(data, account_name=None, funds=None, verbose=False):
     # if account_name is provided then filter out data that is not for
     # the specified account
     if account_name is not None:
-        data = data[data['Accounts'].apply(lambda x: account_name in x)]
+        accounts = data['Accounts']
+        data = data[np.fromiter((account_name in names for names in accounts),
+                                dtype=bool, count=len(accounts))]
 
     # if fund list is provided then only keep funds in the list
     if (funds is not None):
@@ -354,10 +563,12 @@ def extract_data(data, account_name=None, funds=None, verbose=False):
     if (verbose):
         print(f"\nasset_classes: \n{asset_classes}")
 
+    # The fund matrix is stored in column-major order so that its transpose,
+    # the value of the optimization problem parameter, is C-contiguous
     return {
         ACCOUNT_NAME: account_name,
-        FUND_MATRIX: fund_matrix.to_numpy(),
-        ASSET_CLASS_TARGETS: target_allocations.to_numpy(),
+        FUND_MATRIX: np.asfortranarray(fund_matrix.to_numpy(), dtype=np.float64),
+        ASSET_CLASS_TARGETS: np.ascontiguousarray(target_allocations.to_numpy(), dtype=np.float64),
         TICKERS: fund_tickers,
         ASSET_CLASSES: asset_classes
     }
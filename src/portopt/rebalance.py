@@ -18,9 +18,72 @@ Dependencies:
 import pandas as pd
 import numpy as np
 import cvxpy as cp
-from typing import Dict, Union
+from collections import OrderedDict
+from typing import Dict, Optional, Union
 from .utils import write_table, write_weights
 
+# Maximum number of rebalance results memoized per instance
+REBALANCE_CACHE_SIZE = 32
+
+# Solvers tried (in order, if installed) for rebalance problems with binary
+# fund selection variables - the commercial solvers are much faster than SCIP
+MIQP_SOLVERS = (cp.GUROBI, cp.MOSEK, cp.SCIP)
+
+# Solvers tried (in order, if installed) for rebalance problems without integers
+QP_SOLVERS = (cp.OSQP, cp.CLARABEL)
+
+def _solve_rebalance_problem(
+    problem: cp.Problem,
+    has_integers: bool,
+    solver: Optional[str] = None,
+    verbose: bool = False
+) -> None:
+    """
+    Solve the rebalance optimization problem.
+
+    The next solver is tried if a solver fails or does not find an optimal
+    solution (e.g. optimal_inaccurate or user_limit). The status of the last
+    solve is left on the problem for the caller to check.
+
+    Args:
+        problem: Rebalance problem with its parameter values set
+        has_integers: If True, the problem has binary fund selection variables
+        solver: CVXPY solver to use. Default is None, which tries the installed
+                solvers of MIQP_SOLVERS or QP_SOLVERS in order
+        verbose: If True, print solver output. Default is False.
+
+    Raises:
+        cp.error.SolverError: If no solver is installed or the last solver fails
+    """
+    if solver is not None:
+        solvers = [solver]
+    else:
+        installed = cp.installed_solvers()
+        solvers = [s for s in (MIQP_SOLVERS if has_integers else QP_SOLVERS) if s in installed]
+        if not solvers:
+            raise cp.error.SolverError(
+                f"None of the rebalance solvers are installed: "
+                f"{MIQP_SOLVERS if has_integers else QP_SOLVERS}"
+            )
+
+    for i, name in enumerate(solvers):
+        last = i == len(solvers) - 1
+        try:
+            problem.solve(solver=name, warm_start=True, verbose=verbose)
+        except cp.error.SolverError:
+            # Fall back to the next solver (e.g. a commercial solver without a license)
+            if last:
+                raise
+            if verbose:
+                print(f"Solver {name} failed, falling back to {solvers[i + 1]}")
+            continue
+
+        if problem.status == 'optimal' or last:
+            return
+        if verbose:
+            print(f"Solver {name} returned status {problem.status}, "
+                  f"falling back to {solvers[i + 1]}")
+
 class RebalanceMixin:
     """
     Mixin class that adds portfolio rebalancing capabilities to Portfolio class.
@@ -43,6 +106,9 @@ class RebalanceMixin:
 
         Returns:
             DataFrame with original and new allocations
+
+        Raises:
+            KeyError: If a source or destination factor is not in the current allocations
         """
         # Get current allocations to use as base
         base_allocations = self.getMetrics('Factor', portfolio_allocation=True)['Allocation']
@@ -59,20 +125,24 @@ class RebalanceMixin:
             print(f"Destination factors total: {dest_total:.2%}")
             print(f"Transfer amount: {transfer:.2%}")
 
-        # Create target allocations starting from current allocations
-        target_allocations = base_allocations.copy()
-
         # Get source and destination factors
         source_factors = source_metrics.index
         dest_factors = dest_metrics.index
-
-        # Scale down source factors proportionally
-        source_scale = (source_total - transfer) / source_total
-        target_allocations[source_factors] *= source_scale
-
-        # Scale up destination factors proportionally
-        dest_scale = (dest_total + transfer) / dest_total
-        target_allocations[dest_factors] *= dest_scale
+        for factors in (source_factors, dest_factors):
+            missing_factors = factors.difference(base_allocations.index)
+            if not missing_factors.empty:
+                raise KeyError(f"{list(missing_factors)} not in index")
+
+        # Scale factors for the current allocations:
+        # - scale down source factors proportionally
+        # - scale up destination factors proportionally
+        scale = np.ones(len(base_allocations))
+        scale[base_allocations.index.isin(source_factors)] *= (source_total - transfer) / source_total
+        scale[base_allocations.index.isin(dest_factors)] *= (dest_total + transfer) / dest_total
+
+        # Create target allocations from current allocations in one vectorized
+        # multiplication (the current allocations are returned unchanged)
+        target_allocations = base_allocations * scale
 
         # Create DataFrame with original and new allocations
         results = pd.DataFrame({
@@ -108,6 +178,7 @@ class RebalanceMixin:
         turnover_penalty: float = 1.0,
         complexity_penalty: float = 0.0,
         min_ticker_alloc: float = 0.0,
+        solver: Optional[str] = None,
         verbose: bool = False
     ) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -123,6 +194,10 @@ class RebalanceMixin:
                             0.0 means ignore portfolio complexity
             min_ticker_alloc: Minimum non-zero allocation for any fund (default: 0.0)
                       Fund allocation will either be 0 or >= min_ticker_alloc
+            solver: CVXPY solver to use (e.g. cp.GUROBI). Default is None, which uses
+                    the first installed solver of MIQP_SOLVERS when the complexity
+                    penalty or minimum ticker allocation is set, and of QP_SOLVERS
+                    otherwise, falling back to the next one if a solver fails
             verbose: If True, print optimization details. Default is False.
 
         Returns:
@@ -133,89 +208,69 @@ class RebalanceMixin:
         Note: This initial implementation treats all accounts as one portfolio and
               assumes all tickers are available for allocation.
         """
+        # Repeated calls with the same arguments (e.g. when parameters are tweaked
+        # interactively) return the memoized result until the portfolio data changes
+        key = (
+            tuple(target_factor_allocations.index),
+            target_factor_allocations.to_numpy(dtype=np.float64).tobytes(),
+            float(turnover_penalty),
+            float(complexity_penalty),
+            float(min_ticker_alloc),
+            solver,
+        )
+        sources = (self.getHoldings(), self.getPrices(), self.getFactorWeights())
+        if not verbose:
+            result = self._get_memoized_rebalance(key, sources)
+            if result is not None:
+                return result
+
         # Get current portfolio data
         current_ticker_allocations = self.getMetrics('Ticker')['Allocation']
         account_tickers = self.getAccountTickers()
-        factor_weights = self.getFactorWeights()
 
         # Prepare optimization inputs
         tickers = account_tickers.index.get_level_values('Ticker').unique()
         factors = target_factor_allocations.index
 
-        # Create factor weights matrix (factors x tickers)
-        F = pd.pivot_table(
-            factor_weights,
-            values='Weight',
-            index='Factor',
-            columns='Ticker',
-            fill_value=0
-        )
-
-        # Reindex F to match exactly:
-        # - rows (factors): 
-        #   1. Keep only factors that are in target_factor_allocations
-        #   2. Add rows with zeros for any target factors not in factor_weights
-        #   3. Ensure factors are in same order as target_factor_allocations
-        # - columns (tickers):
-        #   1. Keep only tickers that are in our account_tickers DataFrame
-        #   2. Ensure tickers are in same order as the unique tickers list
-        #
-        # This is crucial for the optimization to work correctly because:
-        # 1. Allows element-wise comparison in the objective function:
-        #    portfolio_factor_allocations = F @ x
-        #    minimize: sum_squares(portfolio_factor_allocations - target_factor_allocations)
-        # 2. Ensures matrix dimensions are compatible for optimization
-        F = F.reindex(index=factors, columns=tickers, fill_value=0)
+        # Get factor weights matrix (factors x tickers)
+        F = self._get_factor_matrix(factors, tickers)
 
         if verbose:
             print("\nFactor weights matrix F:")
-            print(F)
+            print(pd.DataFrame(F, index=factors, columns=tickers))
             print("\nTarget allocations:")
             print(target_factor_allocations)
 
-        # Set up optimization problem
-        x = cp.Variable(len(tickers))  # Allocation percentages to each ticker
-        z = cp.Variable(len(tickers), boolean=True)  # Binary selection variables
-
-        # Objective: Minimize weighted sum of:
-        # 1. Squared differences between target and actual factor allocations
-        # 2. Squared differences between current and new ticker allocations
-        # 3. Number of funds used (complexity penalty)
-
-        # 1. Set up factor objective
-        portfolio_factor_allocations = F.to_numpy() @ x
-        factor_objective = cp.sum_squares(portfolio_factor_allocations - target_factor_allocations.to_numpy())
-
-        # 2. Set up turnover objective
-        turnover_objective = cp.sum_squares(x - current_ticker_allocations.to_numpy())
-
-        # 3. Set up complexity objective
-        complexity_objective = cp.sum(z)  # Count number of funds used
-
-        # Define objective
-        objective = cp.Minimize(
-            factor_objective +
-            turnover_penalty * turnover_objective +
-            complexity_penalty * complexity_objective
+        # Get the optimization problem for the shape of the inputs and set its
+        # parameters - repeated calls (e.g. a sweep over the penalties or the
+        # target allocations) re-use the compiled problem
+        has_integers = complexity_penalty != 0 or min_ticker_alloc != 0
+        opt = self._get_rebalance_problem(len(factors), len(tickers), has_integers)
+        opt['factor_weights'].value = F
+        opt['target_factor_allocations'].value = target_factor_allocations.to_numpy()
+        # The turnover objective is scaled inside the squared norm so that the
+        # problem remains DPP (penalty * sum_squares(x - current))
+        turnover_scale = np.sqrt(turnover_penalty)
+        opt['turnover_scale'].value = turnover_scale
+        opt['scaled_current_allocations'].value = (
+            turnover_scale * current_ticker_allocations.reindex(tickers, fill_value=0).to_numpy()
         )
 
-        # Define constraints
-        constraints = [
-            cp.sum(x) == 1,            # Allocations must sum to 100%
-            x >= 0,                    # No negative allocations
-            x <= z,                    # Link x and z (if z=0, x=0)
-            x >= min_ticker_alloc * z  # Minimum allocation when fund is selected
-        ]
-
-        # Solve optimization problem
-        problem = cp.Problem(objective, constraints)
-        problem.solve(solver=cp.SCIP, verbose=verbose)
+        # Solve optimization problem - without the binary selection variables the
+        # problem is a QP that OSQP solves warm started from the previous solution
+        problem = opt['problem']
+        if has_integers:
+            opt['complexity_penalty'].value = complexity_penalty
+            opt['min_ticker_alloc'].value = min_ticker_alloc
+        _solve_rebalance_problem(problem, has_integers, solver, verbose)
 
         if problem.status != 'optimal':
             raise RuntimeError(f"Optimization failed with status: {problem.status}")
+        x = opt['x']
 
-        # Create new allocations series
-        new_ticker_allocations = pd.Series(x.value, index=tickers)
+        # Create new allocations series - the QP solvers can return tiny
+        # negative allocations within their tolerance, which are clipped to 0
+        new_ticker_allocations = pd.Series(np.maximum(x.value, 0), index=tickers)
 
         # Ticker results
         ticker_results = pd.DataFrame(index=tickers)
@@ -226,11 +281,212 @@ class RebalanceMixin:
         # Factor results
         factor_results = pd.DataFrame(index=factors)
         factor_results['Original Allocation'] = self.getMetrics('Factor')['Allocation']
-        factor_results['New Allocation'] = F @ new_ticker_allocations
+        factor_results['New Allocation'] = F @ new_ticker_allocations.to_numpy()
         factor_results['Target Allocation'] = target_factor_allocations
         factor_results['Allocation Diff'] = factor_results['New Allocation'] - factor_results['Target Allocation']
 
-        return ticker_results, factor_results
+        return self._memoize_rebalance(key, sources, (ticker_results, factor_results))
+
+    def _get_memoized_rebalance(
+        self,
+        key: tuple,
+        sources: tuple
+    ) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Get a copy of the memoized result of a rebalance call.
+
+        Args:
+            key: rebalance arguments (target factor allocations, penalties and solver)
+            sources: Current holdings, prices and factor weights DataFrames
+
+        Returns:
+            Copy of the memoized ticker and factor results, or None if the call has
+            not been memoized or the portfolio data has changed since
+        """
+        cache = getattr(self, '_rebalance_results', None)
+        if cache is None:
+            cache = self._rebalance_results = OrderedDict()
+
+        cached = cache.get(key)
+        if cached is None or any(a is not b for a, b in zip(cached[0], sources)):
+            return None
+        cache.move_to_end(key)
+        # Callers may modify the results they get
+        return tuple(result.copy() for result in cached[1])
+
+    def _memoize_rebalance(
+        self,
+        key: tuple,
+        sources: tuple,
+        results: tuple[pd.DataFrame, pd.DataFrame]
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Memoize the result of a rebalance call until the portfolio data changes.
+
+        Args:
+            key: rebalance arguments (see _get_memoized_rebalance)
+            sources: Holdings, prices and factor weights DataFrames the results
+                     were calculated from
+            results: Ticker and factor results to memoize
+
+        Returns:
+            Copy of the results for the caller
+        """
+        cache = getattr(self, '_rebalance_results', None)
+        if cache is None:
+            cache = self._rebalance_results = OrderedDict()
+
+        # Changed sources mean the data was refreshed - drop all results calculated
+        # from the previous data so they don't keep old tables in memory
+        if any(any(a is not b for a, b in zip(cached_sources, sources))
+               for cached_sources, _ in cache.values()):
+            cache.clear()
+
+        cache[key] = (sources, results)
+        if len(cache) > REBALANCE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return tuple(result.copy() for result in results)
+
+    def _get_factor_matrix(self, factors: pd.Index, tickers: pd.Index) -> np.ndarray:
+        """
+        Get the factor weights matrix used by the rebalance optimization.
+
+        The matrix is cached along with the factor weights DataFrame it was
+        created from, and is only created again when the factors or tickers
+        change or getFactorWeights returns a different DataFrame (e.g. after
+        a forceRefresh).
+
+        The matrix is built directly from the (Factor, Ticker, Weight) entries
+        of the long-form factor weights, which are sparse (each ticker only has
+        a few factors), and its rows and columns match the factors and tickers
+        exactly:
+        - rows (factors):
+          1. Keep only factors that are in factors
+          2. Add rows with zeros for any factors not in the factor weights
+          3. Ensure factors are in the same order as factors
+        - columns (tickers):
+          1. Keep only tickers that are in tickers
+          2. Ensure tickers are in the same order as tickers
+
+        This is crucial for the optimization to work correctly because:
+        1. Allows element-wise comparison in the objective function:
+           portfolio_factor_allocations = F @ x
+           minimize: sum_squares(portfolio_factor_allocations - target_factor_allocations)
+        2. Ensures matrix dimensions are compatible for optimization
+
+        Args:
+            factors: Factors (rows of the matrix)
+            tickers: Tickers (columns of the matrix)
+
+        Returns:
+            Contiguous float64 array of factor weights (factors x tickers)
+        """
+        factor_weights = self.getFactorWeights()
+
+        cached = getattr(self, '_factor_matrix_cache', None)
+        if (cached is not None and cached[0] is factor_weights
+                and cached[1].equals(factors) and cached[2].equals(tickers)):
+            return cached[3]
+
+        # Scatter the weights into the matrix by position - the factor and
+        # ticker positions are looked up once per unique index level value and
+        # mapped to the rows through the level codes (a position of -1 is a
+        # factor or ticker that is not in the matrix and is dropped)
+        index = factor_weights.index
+        factor_level = index.names.index('Factor')
+        ticker_level = index.names.index('Ticker')
+        rows = np.append(factors.get_indexer(index.levels[factor_level]), -1)[index.codes[factor_level]]
+        cols = np.append(tickers.get_indexer(index.levels[ticker_level]), -1)[index.codes[ticker_level]]
+        keep = (rows >= 0) & (cols >= 0)
+
+        F = np.zeros((len(factors), len(tickers)), dtype=np.float64)
+        F[rows[keep], cols[keep]] = factor_weights['Weight'].to_numpy(dtype=np.float64)[keep]
+
+        self._factor_matrix_cache = (factor_weights, factors, tickers, F)
+        return F
+
+    def _get_rebalance_problem(
+        self,
+        num_factors: int,
+        num_tickers: int,
+        has_integers: bool
+    ) -> Dict[str, Union[cp.Problem, cp.Parameter, cp.Variable]]:
+        """
+        Get the rebalance optimization problem for the given input shape.
+
+        The problem inputs (factor weights matrix, target and current allocations
+        and penalties) are CVXPY parameters, so the problem is built once per
+        shape and CVXPY re-uses its compiled form when it is solved again with
+        new parameter values. Problems are cached on the instance.
+
+        Objective: Minimize weighted sum of:
+        1. Squared differences between target and actual factor allocations
+        2. Squared differences between current and new ticker allocations
+        3. Number of funds used (complexity penalty)
+
+        Args:
+            num_factors: Number of factors (rows of the factor weights matrix)
+            num_tickers: Number of tickers (columns of the factor weights matrix)
+            has_integers: If True, include the binary fund selection variables used
+                          by the complexity penalty and minimum ticker allocation
+
+        Returns:
+            Dictionary with the problem, its parameters and the allocation variable x
+        """
+        problems = getattr(self, '_rebalance_problems', None)
+        if problems is None:
+            problems = self._rebalance_problems = {}
+
+        key = (num_factors, num_tickers, has_integers)
+        opt = problems.get(key)
+        if opt is not None:
+            return opt
+
+        opt = {
+            'factor_weights': cp.Parameter((num_factors, num_tickers)),
+            'target_factor_allocations': cp.Parameter(num_factors),
+            'turnover_scale': cp.Parameter(nonneg=True),
+            'scaled_current_allocations': cp.Parameter(num_tickers),
+            'x': cp.Variable(num_tickers),  # Allocation percentages to each ticker
+        }
+        x = opt['x']
+
+        # 1. Set up factor objective - the deviation from the targets is an
+        # auxiliary variable so that the factor weights matrix is kept out of
+        # the quadratic objective, which is much smaller for the solver than
+        # the expanded sum of squares (the turnover objective is already diagonal)
+        portfolio_factor_allocations = opt['factor_weights'] @ x
+        factor_deviation = cp.Variable(num_factors)
+        factor_objective = cp.sum_squares(factor_deviation)
+
+        # 2. Set up turnover objective (weighted by the turnover penalty)
+        turnover_objective = cp.sum_squares(opt['turnover_scale'] * x - opt['scaled_current_allocations'])
+
+        # Define constraints
+        constraints = [
+            factor_deviation == portfolio_factor_allocations - opt['target_factor_allocations'],
+            cp.sum(x) == 1,            # Allocations must sum to 100%
+            x >= 0,                    # No negative allocations
+        ]
+        objective = factor_objective + turnover_objective
+
+        if has_integers:
+            z = cp.Variable(num_tickers, boolean=True)  # Binary selection variables
+            opt['complexity_penalty'] = cp.Parameter(nonneg=True)
+            opt['min_ticker_alloc'] = cp.Parameter(nonneg=True)
+
+            # 3. Set up complexity objective
+            complexity_objective = cp.sum(z)  # Count number of funds used
+            objective = objective + opt['complexity_penalty'] * complexity_objective
+
+            constraints += [
+                x <= z,                                 # Link x and z (if z=0, x=0)
+                x >= opt['min_ticker_alloc'] * z        # Minimum allocation when fund is selected
+            ]
+
+        opt['problem'] = cp.Problem(cp.Minimize(objective), constraints)
+        problems[key] = opt
+        return opt
 
     def _create_factor_weights_matrix(
         self,
@@ -400,16 +656,13 @@ class RebalanceMixin:
                 f"Target allocations must sum to 100%, got {total_allocation:.2%}"
             )
 
-        # Create new series with all factors from reference list
-        result = pd.Series(
-            0.0, 
-            index=target_allocations.index,
-            name=target_allocations.name  # Preserve original Series name
+        # Create new series with all factors from reference list, filling in
+        # the provided target allocations (missing allocations are 0)
+        result = (
+            target_allocations.fillna(0.0)
+            .astype(float)
+            .rename_axis('Factor')  # Set name for the index
         )
-        result.index.name = 'Factor'  # Set name for the index
-
-        # Fill in provided target allocations
-        result.update(target_allocations)
 
         # Scale allocations by account proportion
         if account_proportion != 1.0:
@@ -702,7 +955,7 @@ class RebalanceMixin:
         # Create and solve the optimization problem
         problem = cp.Problem(objective, constraints)
         try:
-            problem.solve(solver=cp.SCIP, verbose=verbose)
+            _solve_rebalance_problem(problem, problem.is_mixed_integer(), verbose=verbose)
         except Exception as e:
             raise RuntimeError(f"Optimization failed: {str(e)}")
 
@@ -950,16 +1203,14 @@ class RebalanceMixin:
                                             portfolio_allocation=True
                                             )['Allocation']
 
-        # Create new series with all tickers from reference list
-        result = pd.Series(
-            0.0,
-            index=tickers,
-            name=current_allocations.name  # Preserve original Series name
+        # Create new series with all tickers from reference list, filling in
+        # the current allocations (missing tickers are 0)
+        result = (
+            current_allocations.reindex(tickers, fill_value=0.0)
+            .fillna(0.0)
+            .astype(float)
+            .rename_axis('Ticker')  # Set name for the index
         )
-        result.index.name = 'Ticker'  # Set name for the index
-
-        # Fill in current allocations
-        result.update(current_allocations)
 
         if verbose:
             print("\nCurrent allocations:")
@@ -1410,16 +1661,15 @@ class PortfolioRebalancer:
         # Get tickers in canonical order
         canonical_tickers = self.getAccountTickers(account)
 
-        # Create new series with canonical ordering
-        result = pd.Series(
-            0.0,  # Default to 0 for any missing tickers
-            index=canonical_tickers,
-            name='Allocation'  # Use consistent name for the allocation column
+        # Create new series with canonical ordering, filling in the current
+        # allocations (default to 0 for any missing tickers)
+        result = (
+            account_allocations.reindex(canonical_tickers, fill_value=0.0)
+            .fillna(0.0)
+            .astype(float)
+            .rename('Allocation')  # Use consistent name for the allocation column
         )
 
-        # Fill in current allocations
-        result.update(account_allocations)
-
         return result
 
     def getAccountVariables(self, account: str, verbose: bool = False) -> Dict[str, cp.Variable]:
@@ -1801,9 +2051,11 @@ class AccountRebalancer:
         # Get tickers in canonical order
         tickers = self.getTickers()
 
-        # Create new allocations series from optimization variables
+        # Create new allocations series from optimization variables - without the
+        # binary variables the QP solvers can return tiny negative allocations
+        # within their tolerance, which are clipped to 0
         self._new_ticker_allocations = pd.Series(
-            variables['x'].value.flatten(),
+            np.maximum(variables['x'].value.flatten(), 0),
             index=tickers,
             name='New Allocation'
         )
@@ -2301,6 +2553,9 @@ class AccountRebalancer:
         3. Link between allocation variables (x) and selection variables (z)
         4. Minimum allocation when a fund is selected
 
+        Constraints 3 and 4 are only included when the complexity penalty or
+        minimum ticker allocation is set (see _has_integers).
+
         The constraints are cached after first creation to ensure they are not
         recreated in subsequent calls.
 
@@ -2329,9 +2584,12 @@ class AccountRebalancer:
             # Sum of allocations equals account's proportion of portfolio
             cp.sum(variables['x']) == account_proportion,
             variables['x'] >= 0,                                 # No negative allocations
-            variables['x'] <= variables['z'],                    # Link x and z
-            variables['x'] >= min_ticker_alloc * variables['z']  # Minimum allocation
         ]
+        if self._has_integers():
+            self._constraints += [
+                variables['x'] <= variables['z'],                    # Link x and z
+                variables['x'] >= min_ticker_alloc * variables['z']  # Minimum allocation
+            ]
 
         if verbose:
             print(f"\nConstraints for account {self._account}:")
@@ -2341,11 +2599,25 @@ class AccountRebalancer:
             print(f" - Constraint types:")
             print(f"   1. Sum of allocations = {account_proportion:.2%}")
             print(f"   2. No negative allocations")
-            print(f"   3. Link x and z variables")
-            print(f"   4. Minimum allocation when selected: {min_ticker_alloc:.2%}")
+            if self._has_integers():
+                print(f"   3. Link x and z variables")
+                print(f"   4. Minimum allocation when selected: {min_ticker_alloc:.2%}")
 
         return self._constraints
 
+    def _has_integers(self) -> bool:
+        """Check if the optimization problem needs the binary selection variables (z).
+
+        The binary variables only have an effect when the complexity penalty or the
+        minimum ticker allocation is set. Without them the problem is a QP, which is
+        solved much faster than the mixed-integer problem.
+
+        Returns:
+            bool: True if the complexity penalty or minimum ticker allocation is set
+        """
+        return (self._port_rebalancer.getComplexityPenalty() != 0
+                or self._port_rebalancer._min_ticker_alloc != 0)
+
     def validate(self, verbose: bool = False) -> None:
         """Validate that all ticker-related and factor-related components are properly aligned.
 
@@ -2486,22 +2758,25 @@ class AccountRebalancer:
         # Get objectives
         factor_objective = self.getFactorObjective(verbose=verbose)
         turnover_objective = self.getTurnoverObjective(verbose=verbose)
-        complexity_objective = self.getComplexityObjective(verbose=verbose)
 
-        # Construct the objective function
-        objective = cp.Minimize(
+        # Construct the objective function - the complexity objective is only
+        # added when the binary selection variables are needed
+        objective = (
             account_align_penalty * factor_objective +
-            turnover_penalty * turnover_objective +
-            complexity_penalty * complexity_objective
+            turnover_penalty * turnover_objective
         )
+        has_integers = self._has_integers()
+        if has_integers:
+            complexity_objective = self.getComplexityObjective(verbose=verbose)
+            objective = objective + complexity_penalty * complexity_objective
 
         # Get constraints
         constraints = self.getConstraints(verbose=verbose)
 
         # Create and solve the optimization problem
-        problem = cp.Problem(objective, constraints)
+        problem = cp.Problem(cp.Minimize(objective), constraints)
         try:
-            problem.solve(solver=cp.SCIP, verbose=verbose)
+            _solve_rebalance_problem(problem, has_integers, verbose=verbose)
         except Exception as e:
             raise RuntimeError(f"Optimization failed: {str(e)}")
 
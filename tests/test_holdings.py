@@ -3,7 +3,10 @@ Tests for holdings module functions.
 """
 import pytest
 import pandas as pd
-from portopt.holdings import get_converters
+import os
+from datetime import date
+import portopt.holdings as holdings_module
+from portopt.holdings import get_converters, holdings_cache_key
 from portopt.config import default_config
 
 
@@ -139,3 +142,52 @@ class TestCleanNumeric:
         for input_value, expected in test_cases:
             result = clean_numeric(input_value)
             assert result == expected, f"Failed to clean {input_value}: got {result}, expected {expected}"
+
+
+class TestHoldingsCacheKey:
+    """Test cases for holdings_cache_key function."""
+
+    def test_cache_key_changes_with_inputs(self, tmp_path):
+        """Test that the cache key changes when the files or configuration change."""
+        holdings_file = tmp_path / "holdings.csv"
+        holdings_file.write_text("Symbol,Quantity\nAAPL,10\n")
+        config = default_config()
+
+        key = holdings_cache_key(str(tmp_path), config=config)
+        assert key == holdings_cache_key(str(tmp_path), config=config)
+
+        # Modified file
+        holdings_file.write_text("Symbol,Quantity\nAAPL,20\n")
+        os.utime(holdings_file, ns=(0, 0))
+        modified_key = holdings_cache_key(str(tmp_path), config=config)
+        assert modified_key != key
+
+        # Added file
+        (tmp_path / "more_holdings.csv").write_text("Symbol,Quantity\nMSFT,5\n")
+        added_key = holdings_cache_key(str(tmp_path), config=config)
+        assert added_key != modified_key
+
+        # Changed configuration
+        config['ignore_tickers'] = ['MSFT']
+        assert holdings_cache_key(str(tmp_path), config=config) != added_key
+
+    def test_cache_key_changes_daily_with_proxy_funds(self, tmp_path, monkeypatch):
+        """Test that the cache key includes the date only when proxy funds are configured."""
+        (tmp_path / "holdings.csv").write_text("Symbol,Quantity\nAAPL,10\n")
+        config = default_config()
+        proxy_config = dict(config, proxy_funds={'TRUST': 'VOO'})
+
+        class Today(date):
+            day_offset = 0
+
+            @classmethod
+            def today(cls):
+                return date(2024, 1, 1 + cls.day_offset)
+
+        monkeypatch.setattr(holdings_module, 'date', Today)
+        key = holdings_cache_key(str(tmp_path), config=config)
+        proxy_key = holdings_cache_key(str(tmp_path), config=proxy_config)
+
+        Today.day_offset = 1
+        assert holdings_cache_key(str(tmp_path), config=config) == key
+        assert holdings_cache_key(str(tmp_path), config=proxy_config) != proxy_key
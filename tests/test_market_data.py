@@ -7,8 +7,10 @@ from portopt.market_data import (
     is_option_ticker,
     is_security_ticker,
     parse_option_symbol,
-    is_underlying_ticker
+    is_underlying_ticker,
+    tickers_cache_key
 )
+from datetime import date
 
 
 class TestIsOptionTicker:
@@ -196,4 +198,21 @@ class TestTickerTypeDetection:
         for ticker in security_tickers:
             assert is_security_ticker(ticker), f"{ticker} should be detected as security"
             assert not is_option_ticker(ticker), f"{ticker} should not be detected as option"
-            assert is_underlying_ticker(ticker), f"{ticker} should be an underlying"
\ No newline at end of file
+            assert is_underlying_ticker(ticker), f"{ticker} should be an underlying"
+
+
+class TestTickersCacheKey:
+    """Test cases for tickers_cache_key function."""
+
+    def test_cache_key_changes_with_tickers_and_date(self):
+        """Test that the cache key depends on the set of tickers and the date only."""
+        day = date(2025, 3, 21)
+        key = tickers_cache_key(['VTSAX', 'SPY'], as_of=day)
+
+        # Same tickers in any order and container
+        assert key == tickers_cache_key(pd.Index(['SPY', 'VTSAX']), as_of=day)
+        assert key == tickers_cache_key({'SPY', 'VTSAX'}, as_of=day)
+
+        # Different tickers or a new day
+        assert key != tickers_cache_key(['VTSAX'], as_of=day)
+        assert key != tickers_cache_key(['VTSAX', 'SPY'], as_of=date(2025, 3, 22))
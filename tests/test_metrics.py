@@ -2,9 +2,18 @@
 Test suite for MetricsMixin class.
 """
 
+import re
+import itertools
+import threading
+import tempfile
+from pathlib import Path
 import pandas as pd
 import numpy as np
-from portopt.metrics import MetricsMixin
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
+import portopt.metrics as metrics_module
+from portopt.portfolio import Portfolio
+from portopt.metrics import MetricsMixin, _compute_allocations, _group_sums
 from portopt.utils import write_table
 import pytest
 
@@ -1099,6 +1108,458 @@ def test_metrics_performance_with_large_dimensions():
     assert np.isclose(result['Allocation'].sum(), 1.0), \
         "Multi-dimension allocations should sum to 100%"
 
+def test_registered_tables_are_reused():
+    """Test that tables are only re-registered when the source data changes."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    # Always use the DuckDB query
+    metrics.metrics_duckdb_threshold = 0
+
+    first = metrics.getMetrics('Level_0', metrics=['Value'])
+    holdings_table = metrics._ibis_tables['holdings_valued'][1]
+    compiled_queries = len(metrics._sql_cache)
+
+    # Same source data - registered table and compiled SQL are reused
+    second = metrics.getMetrics('Level_0', metrics=['Value'])
+    assert metrics._ibis_tables['holdings_valued'][1] is holdings_table, \
+        "Table should not be re-registered when the data is unchanged"
+    assert len(metrics._sql_cache) == compiled_queries, \
+        "SQL should not be recompiled for an identical query"
+    pd.testing.assert_frame_equal(first, second)
+
+    # New source data (e.g. after a refresh) - table is re-registered
+    new_prices = test_data['prices'] * 2
+    metrics.getPrices = lambda **kwargs: new_prices
+    refreshed = metrics.getMetrics('Level_0', metrics=['Value'])
+    assert metrics._ibis_tables['holdings_valued'][1] is not holdings_table, \
+        "Table should be re-registered when the data changes"
+    assert np.allclose(refreshed['Value'], 2 * first['Value'])
+
+    # Closing the connection drops registered tables - next call reconnects
+    metrics._close_connection()
+    assert metrics._con is None and not metrics._ibis_tables
+    reopened = metrics.getMetrics('Level_0', metrics=['Value'])
+    pd.testing.assert_frame_equal(refreshed, reopened)
+
+def test_registered_string_columns_are_dictionary_encoded():
+    """Test that dimension columns are registered as dictionary encoded Arrow columns."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    # Always use the DuckDB query
+    metrics.metrics_duckdb_threshold = 0
+
+    result = metrics.getMetrics('Ticker', 'Level_0', filters={'Account': ['IRA']})
+    for name in ['holdings_valued', 'holdings_factor_levels']:
+        schema = metrics._ibis_tables[name][2].schema
+        for col in ['Ticker', 'Account']:
+            assert pa.types.is_dictionary(schema.field(col).type), \
+                f"{name}.{col} should be dictionary encoded"
+
+    # Results contain plain string dimension values
+    assert set(result.index.get_level_values('Ticker')) <= set(test_data['prices'].index)
+
+def test_filter_values_reuse_queries():
+    """Test that filtering the same dimensions on different values reuses the queries."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    # Always use the DuckDB query
+    metrics.metrics_duckdb_threshold = 0
+
+    ira = metrics.getMetrics('Level_0', filters={'Account': ['IRA']}, portfolio_allocation=True)
+    cached_queries = len(metrics._metrics_query_cache)
+    compiled_queries = len(metrics._sql_cache)
+
+    k401 = metrics.getMetrics('Level_0', filters={'Account': '401k'}, portfolio_allocation=True)
+    assert len(metrics._metrics_query_cache) == cached_queries, \
+        "Query should be reused when only the filter values change"
+    assert len(metrics._sql_cache) == compiled_queries, \
+        "SQL should not be recompiled when only the filter values change"
+
+    # Unchanged filter values are not registered again
+    bound = metrics._filter_tables['filter_values_0'][1]
+    metrics.getMetrics('Level_0', filters={'Account': '401k'}, portfolio_allocation=True)
+    assert metrics._filter_tables['filter_values_0'][1] is bound
+
+    # Results reflect the bound filter values
+    both = metrics.getMetrics('Level_0', filters={'Account': ['IRA', '401k']}, portfolio_allocation=True)
+    combined = ira.add(k401, fill_value=0).reindex(both.index)
+    assert np.allclose(both['Value'], combined['Value'])
+    assert np.allclose(both['Allocation'], combined['Allocation'])
+
+    # Metrics calculated by the same aggregates share a query
+    metrics.getMetrics('Level_0', metrics=['Value'])
+    cached_queries = len(metrics._metrics_query_cache)
+    metrics.getMetrics('Level_0', metrics=['Allocation'])
+    metrics.getMetrics('Level_0', metrics=['Allocation', 'Value'])
+    assert len(metrics._metrics_query_cache) == cached_queries, \
+        "Value and Allocation metrics should share the same query"
+
+    # Any iterable of filter values
+    for values in [('IRA', '401k'), {'IRA', '401k'}, (account for account in ['IRA', '401k'])]:
+        result = metrics.getMetrics('Level_0', filters={'Account': values}, portfolio_allocation=True)
+        pd.testing.assert_frame_equal(result.sort_index(), both.sort_index())
+    pd.testing.assert_frame_equal(metrics.getMetrics('Ticker', filters={'Account': {'IRA'}}),
+                                  metrics.getMetrics('Ticker', filters={'Account': ['IRA']}))
+
+    # No matching values - empty result
+    none = metrics.getMetrics('Level_0', filters={'Account': []})
+    assert len(none) == 0
+
+def test_factor_join_reused_until_data_changes():
+    """Test that the pre-joined factor table is reused across queries until the data changes."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    # Always use the DuckDB query
+    metrics.metrics_duckdb_threshold = 0
+
+    metrics.getMetrics('Account', 'Level_0')
+    joined = metrics._ibis_tables['holdings_factor_levels'][0]
+
+    # Different dimensions and filters - same joined table
+    metrics.getMetrics('Level_1', 'Ticker', filters={'Level_0': ['Equity']})
+    metrics.getMetrics('Account', 'Level_0', filters={'Account': ['IRA']}, portfolio_allocation=True)
+    assert metrics._ibis_tables['holdings_factor_levels'][0] is joined, \
+        "Joined factor table should be reused when the data is unchanged"
+
+    # Not grouped or filtered by holdings dimensions - joined to the ticker totals
+    metrics.getMetrics('Level_0', filters={'Level_1': ['US']})
+    ticker_joined = metrics._ibis_tables['ticker_factor_levels'][0]
+    assert len(ticker_joined) < len(joined)
+    metrics.getMetrics('Level_1')
+    assert metrics._ibis_tables['ticker_factor_levels'][0] is ticker_joined
+
+    # Refreshed factor weights - tables are joined again
+    new_weights = test_data['factor_weights'].copy()
+    metrics.getFactorWeights = lambda **kwargs: new_weights
+    result = metrics.getMetrics('Account', 'Level_0')
+    assert metrics._ibis_tables['holdings_factor_levels'][0] is not joined, \
+        "Joined factor table should be rebuilt when the factor weights change"
+    assert np.isclose(result['Allocation'].sum(), 1.0)
+    metrics.getMetrics('Level_0')
+    assert metrics._ibis_tables['ticker_factor_levels'][0] is not ticker_joined
+
+def test_portfolio_total_refreshed_with_data():
+    """Test that the memoized portfolio total is recalculated when the data changes."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    filters = {'Account': ['IRA']}
+
+    first = metrics.getMetrics('Ticker', filters=filters, portfolio_allocation=True)
+    again = metrics.getMetrics('Ticker', filters=filters, portfolio_allocation=True)
+    pd.testing.assert_frame_equal(first, again)
+
+    # Double only the IRA prices - the portfolio total must be recalculated
+    new_prices = test_data['prices'].copy()
+    new_prices.loc[['MSFT', 'BND'], 'Price'] *= 2
+    metrics.getPrices = lambda **kwargs: new_prices
+    refreshed = metrics.getMetrics('Ticker', filters=filters, portfolio_allocation=True)
+
+    total = metrics.getMetrics(metrics=['Value'])['Value'].iloc[0]
+    assert np.allclose(refreshed['Allocation'], refreshed['Value'] / total), \
+        "Allocations should use the refreshed portfolio total"
+
+def test_factor_tables_loaded_only_when_needed():
+    """Test that factor data is not loaded unless factor dimensions/filters are used."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(holdings=test_data['holdings'], prices=test_data['prices'])
+
+    def fail(**kwargs):
+        raise AssertionError("Factor data should not be loaded")
+    metrics.getFactors = fail
+    metrics.getFactorWeights = fail
+
+    # No factor dimensions or filters - factor data is not loaded
+    result = metrics.getMetrics('Ticker', 'Account')
+    assert np.isclose(result['Allocation'].sum(), 1.0)
+    result = metrics.getMetrics()
+    assert len(result) == 1
+
+def test_holdings_metrics_match_duckdb_query():
+    """Test that holdings-only metrics match the metrics calculated by the DuckDB query."""
+    test_data = create_comprehensive_test_data()
+    int_holdings = test_data['holdings'].astype({'Quantity': 'int64'})
+
+    for holdings, dimensions, filters in itertools.product(
+            [test_data['holdings'], int_holdings],
+            [[], ['Ticker'], ['Account', 'Ticker']],
+            [None, {'Account': ['IRA', '401k']}]):
+        metrics = getMetricsMixinInstance(holdings=holdings, prices=test_data['prices'])
+        result, total_value = metrics._get_pandas_metrics('holdings_valued', metrics._get_holdings_valued(),
+                                                          dimensions, ['Quantity', 'Value', 'Allocation'],
+                                                          filters, portfolio_allocation=True)
+
+        tables = metrics._get_base_tables(False, False)
+        filter_tables = metrics._register_filters(filters)
+        query = metrics._build_base_query(tables, dimensions, False, False,
+                                          filter_tables, push_down_filters=True)
+        expected = metrics._execute_query(metrics._add_aggregates(query, dimensions, ['Quantity', 'Value']))
+
+        assert list(result.columns) == list(expected.columns)
+        assert (result.dtypes == expected.dtypes).all(), "Column types should match"
+        if dimensions:
+            result = result.set_index(dimensions).sort_index()
+            expected = expected.set_index(dimensions).sort_index()
+        pd.testing.assert_frame_equal(result, expected)
+
+        # Portfolio total only calculated for filtered results
+        if filters:
+            unfiltered = metrics._build_base_query(tables, dimensions, False, False)
+            expected_total = metrics._execute_query(unfiltered.aggregate(unfiltered.Value.sum().name('Value')))
+            assert np.isclose(total_value, expected_total['Value'].iloc[0])
+        else:
+            assert total_value is None
+
+def test_small_factor_metrics_match_duckdb_query():
+    """Test that factor metrics calculated with pandas match the DuckDB query."""
+    test_data = create_comprehensive_test_data()
+    int_holdings = test_data['holdings'].astype({'Quantity': 'int64'})
+
+    for holdings in [test_data['holdings'], int_holdings]:
+        data = dict(test_data, holdings=holdings)
+        pandas_metrics = getMetricsMixinInstance(**data)
+        duckdb_metrics = getMetricsMixinInstance(**data)
+        duckdb_metrics.metrics_duckdb_threshold = 0
+
+        for dimensions, filters, portfolio_allocation in itertools.product(
+                [[], ['Factor'], ['Level_0', 'Level_1'], ['Account', 'Level_0']],
+                [None, {'Account': ['IRA', '401k']}, {'Level_0': 'Equity'}],
+                [False, True]):
+            result = pandas_metrics.getMetrics(*dimensions, filters=filters,
+                                               portfolio_allocation=portfolio_allocation)
+            expected = duckdb_metrics.getMetrics(*dimensions, filters=filters,
+                                                 portfolio_allocation=portfolio_allocation)
+
+            assert (result.dtypes == expected.dtypes).all(), "Column types should match"
+            pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+    # Only the DuckDB instance registered tables
+    assert not getattr(pandas_metrics, '_ibis_tables', None)
+    assert duckdb_metrics._ibis_tables
+
+def test_numeric_filters_match_pandas():
+    """Test that the DuckDB query filters numeric columns like the pandas calculation."""
+    test_data = create_comprehensive_test_data()
+    pandas_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics.metrics_duckdb_threshold = 0
+
+    for dimensions, filters in [(['Ticker'], {'Price': [150.0]}),
+                                (['Account'], {'Quantity': [10.0, 20.0]}),
+                                (['Ticker'], {'Account': 'IRA', 'Price': [150, 300]}),
+                                (['Ticker'], {'Account': 'IRA'})]:
+        result = pandas_metrics.getMetrics(*dimensions, filters=filters)
+        expected = duckdb_metrics.getMetrics(*dimensions, filters=filters)
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+def test_factor_metrics_by_price():
+    """Test that factor metrics can be grouped by Price on both calculation paths."""
+    test_data = create_comprehensive_test_data()
+    pandas_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics.metrics_duckdb_threshold = 0
+    total_value = pandas_metrics.getMetrics()['Value'].iloc[0]
+
+    for dimensions in [['Level_0', 'Price'], ['Level_0', 'Account', 'Price'],
+                       ['Level_0', 'Ticker', 'Price']]:
+        result = pandas_metrics.getMetrics(*dimensions)
+        expected = duckdb_metrics.getMetrics(*dimensions)
+        pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+        assert np.isclose(result['Value'].sum(), total_value)
+
+    # Price filters select the position-level table too
+    filters = {'Price': [150.0]}
+    result = pandas_metrics.getMetrics('Factor', filters=filters)
+    expected = duckdb_metrics.getMetrics('Factor', filters=filters)
+    pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+    aapl_value = pandas_metrics.getMetrics(filters={'Ticker': 'AAPL'})['Value'].iloc[0]
+    assert np.isclose(result['Value'].sum(), aapl_value)
+
+def test_pandas_and_duckdb_metrics_raise_same_errors():
+    """Test that both metrics calculations reject the same dimensions and filters."""
+    test_data = create_comprehensive_test_data()
+    pandas_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics.metrics_duckdb_threshold = 0
+
+    for dimensions, filters, message in [
+            (['Level_0'], {'Bogus': 'x'}, "Requested filters not found in query: ['Bogus']"),
+            (['Ticker'], {'Bogus': 'x'}, "Requested filters not found in query: ['Bogus']"),
+            (['Factor', 'Weight'], None, "Requested dimensions not found in query: ['Weight']"),
+            (['Quantity'], None, "Requested dimensions not found in query: ['Quantity']")]:
+        for metrics in [pandas_metrics, duckdb_metrics]:
+            with pytest.raises(ValueError, match=re.escape(message)):
+                metrics.getMetrics(*dimensions, filters=filters)
+
+def test_factor_weights_loaded_while_prices_load():
+    """Test that the first factor query loads the factor weights and prices concurrently."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    prices_loading = threading.Event()
+    weights_loading = threading.Event()
+
+    def get_prices(**kwargs):
+        prices_loading.set()
+        # Only returns promptly if the factor weights are loading at the same time
+        assert weights_loading.wait(timeout=5), "Factor weights should load while prices load"
+        return test_data['prices']
+
+    def get_factor_weights(**kwargs):
+        weights_loading.set()
+        assert prices_loading.wait(timeout=5), "Prices should load while factor weights load"
+        return test_data['factor_weights']
+
+    metrics.getPrices = get_prices
+    metrics.getFactorWeights = get_factor_weights
+    result = metrics.getMetrics('Level_0')
+    assert np.isclose(result['Allocation'].sum(), 1.0)
+
+def test_factor_weights_loader_not_started_without_factor_weights(monkeypatch):
+    """Test that factor queries don't start the loader thread without factor weights."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(holdings=test_data['holdings'], prices=test_data['prices'])
+    executors = []
+    monkeypatch.setattr(metrics_module, 'ThreadPoolExecutor',
+                        lambda **kwargs: executors.append(kwargs) or ThreadPoolExecutor(**kwargs))
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match="factor_weights table is not available"):
+            metrics.getMetrics('Level_0')
+    assert not executors
+
+def test_portfolio_factor_capability_flags(tmp_path):
+    """Test that Portfolio only enables the factor tables for a non-empty hierarchy."""
+    weights_file = tmp_path / 'weights.csv'
+    weights_file.write_text('Ticker,US Equity\nAAPL,1.0\n')
+    hierarchy = {'Equity': {'US': 'US Equity'}}
+
+    for config, has_factors in [(None, False),
+                                ({'asset_class_hierarchy': {}}, False),
+                                ({'asset_class_hierarchy': None}, False),
+                                ({}, False),
+                                ({'asset_class_hierarchy': hierarchy}, True)]:
+        portfolio = Portfolio(config, str(weights_file))
+        assert portfolio._has_factors == has_factors
+        assert portfolio._has_factor_weights == has_factors
+        assert not Portfolio(config, None)._has_factor_weights
+
+def test_metrics_results_memoized_until_data_changes():
+    """Test that repeated getMetrics calls return the memoized result until the data changes."""
+    test_data = create_comprehensive_test_data()
+    metrics = getMetricsMixinInstance(**test_data)
+    filters = {'Account': ['IRA', '401k']}
+
+    first = metrics.getMetrics('Level_0', filters=filters, portfolio_allocation=True)
+    assert len(metrics._metrics_result_cache) == 1
+
+    # Same arguments (any iterable of filter values) - memoized copy is returned
+    for values in [['IRA', '401k'], ('IRA', '401k'), (account for account in ['IRA', '401k'])]:
+        again = metrics.getMetrics('Level_0', filters={'Account': values}, portfolio_allocation=True)
+        pd.testing.assert_frame_equal(first, again)
+        assert again is not first
+    assert len(metrics._metrics_result_cache) == 1
+
+    # Modifying a returned result doesn't change the memoized result
+    again['Value'] = 0.0
+    pd.testing.assert_frame_equal(first, metrics.getMetrics('Level_0', filters=filters,
+                                                             portfolio_allocation=True))
+
+    # Different arguments are calculated separately
+    unfiltered = metrics.getMetrics('Level_0', portfolio_allocation=True)
+    assert not unfiltered.equals(first)
+    assert len(metrics._metrics_result_cache) == 2
+
+    # Refreshed prices - results are recalculated and outdated results dropped
+    new_prices = test_data['prices'] * 2
+    metrics.getPrices = lambda **kwargs: new_prices
+    refreshed = metrics.getMetrics('Level_0', filters=filters, portfolio_allocation=True)
+    assert np.allclose(refreshed['Value'], 2 * first['Value'])
+    assert np.allclose(refreshed['Allocation'], first['Allocation'])
+    assert len(metrics._metrics_result_cache) == 1
+
+def test_group_sums_match_groupby():
+    """Test that code-based group sums match a sorted pandas groupby."""
+    rng = np.random.default_rng(7)
+    n = 1000
+    df = pd.DataFrame({
+        'Ticker': pd.Categorical(rng.choice(['AAPL', 'MSFT', 'BND', None], n)),
+        'Account': pd.Categorical(rng.choice(['IRA', '401k', 'Taxable'], n)),
+        'Quantity': rng.integers(0, 100, n),
+        'Value': np.where(rng.random(n) < 0.1, np.nan, rng.uniform(0, 1000, n))
+    })
+    # Infinite values are summed, not treated as missing
+    df.loc[df.index[0], 'Value'] = np.inf
+
+    for dimensions in [['Ticker'], ['Account', 'Ticker']]:
+        result = _group_sums(df, dimensions, ['Quantity', 'Value'])
+        expected = df.groupby(dimensions, sort=True, dropna=False, observed=True)[['Quantity', 'Value']].sum()
+        expected = expected.reset_index()
+        for dim in dimensions:
+            expected[dim] = expected[dim].astype(object)
+        pd.testing.assert_frame_equal(result, expected)
+
+    # Code space too large - caller falls back to a groupby
+    wide = pd.DataFrame({
+        'Ticker': pd.Categorical([f'T{i}' for i in range(3000)]),
+        'Account': pd.Categorical([f'A{i}' for i in range(3000)]),
+        'Value': np.ones(3000)
+    })
+    assert _group_sums(wide, ['Ticker', 'Account'], ['Value']) is None
+
+    # No rows - the sums keep the column dtypes
+    result = _group_sums(df.iloc[:0], ['Account', 'Ticker'], ['Quantity', 'Value'])
+    assert result.empty
+    assert result['Quantity'].dtype == df['Quantity'].dtype
+    assert result['Value'].dtype == np.float64
+
+def test_empty_metrics_dtypes_match_duckdb():
+    """Test that metrics of an empty filter result have the same dtypes as the DuckDB query."""
+    test_data = create_comprehensive_test_data()
+    pandas_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics = getMetricsMixinInstance(**test_data)
+    duckdb_metrics.metrics_duckdb_threshold = 0
+
+    for dimensions, filters in [(['Ticker'], {'Account': 'Missing'}),
+                                (['Account', 'Ticker'], {'Ticker': 'Missing'}),
+                                (['Level_0'], {'Level_0': 'Missing'})]:
+        result = pandas_metrics.getMetrics(*dimensions, filters=filters)
+        expected = duckdb_metrics.getMetrics(*dimensions, filters=filters)
+        assert result.empty
+        pd.testing.assert_series_equal(result.dtypes, expected.dtypes)
+
+def test_metrics_by_numeric_dimension():
+    """Test that metrics grouped by a non-categorical (numeric) column match DuckDB."""
+    test_data = create_comprehensive_test_data()
+    pandas_metrics = getMetricsMixinInstance(holdings=test_data['holdings'], prices=test_data['prices'])
+    duckdb_metrics = getMetricsMixinInstance(holdings=test_data['holdings'], prices=test_data['prices'])
+    duckdb_metrics.metrics_duckdb_threshold = 0
+
+    # Price is a float column - grouped with pandas instead of category codes
+    for dimensions in [['Price'], ['Price', 'Account']]:
+        result = pandas_metrics.getMetrics(*dimensions)
+        expected = duckdb_metrics.getMetrics(*dimensions)
+        pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index())
+
+    holdings_valued = pandas_metrics._get_holdings_valued()
+    assert _group_sums(holdings_valued, ['Price'], ['Value']) is None
+
+def test_compute_allocations_large_result():
+    """Test allocations for large results."""
+    rng = np.random.default_rng(42)
+    values = rng.uniform(0, 1000, 100_001)
+    values[0] = np.nan
+
+    # Filtered allocation - total is the sum of the values
+    allocations = _compute_allocations(values)
+    assert np.isnan(allocations[0]), "Missing values should have missing allocations"
+    assert np.isclose(np.nansum(allocations), 1.0), "Allocations should sum to 100%"
+
+    # Portfolio allocation - total is provided
+    total = 2 * np.nansum(values)
+    allocations = _compute_allocations(values, total)
+    assert np.allclose(allocations[1:], values[1:] / total), \
+        "Allocations should be relative to the provided total"
+
 # ==============================================================================
 # Test Runners
 # ==============================================================================
@@ -1169,6 +1630,59 @@ if __name__ == "__main__":
     test_metrics_performance_with_large_dimensions()
     print("✓ test_metrics_performance_with_large_dimensions")
 
+    test_registered_tables_are_reused()
+    print("✓ test_registered_tables_are_reused")
+
+    test_portfolio_total_refreshed_with_data()
+    print("✓ test_portfolio_total_refreshed_with_data")
+
+    test_factor_tables_loaded_only_when_needed()
+    print("✓ test_factor_tables_loaded_only_when_needed")
+
+    test_factor_join_reused_until_data_changes()
+    print("✓ test_factor_join_reused_until_data_changes")
+
+    test_filter_values_reuse_queries()
+    print("✓ test_filter_values_reuse_queries")
+
+    test_numeric_filters_match_pandas()
+    print("✓ test_numeric_filters_match_pandas")
+
+    test_factor_metrics_by_price()
+    print("✓ test_factor_metrics_by_price")
+
+    test_registered_string_columns_are_dictionary_encoded()
+    print("✓ test_registered_string_columns_are_dictionary_encoded")
+
+    test_holdings_metrics_match_duckdb_query()
+    print("✓ test_holdings_metrics_match_duckdb_query")
+    test_small_factor_metrics_match_duckdb_query()
+    print("✓ test_small_factor_metrics_match_duckdb_query")
+    test_pandas_and_duckdb_metrics_raise_same_errors()
+    print("✓ test_pandas_and_duckdb_metrics_raise_same_errors")
+    test_factor_weights_loaded_while_prices_load()
+    print("✓ test_factor_weights_loaded_while_prices_load")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_factor_weights_loader_not_started_without_factor_weights(monkeypatch)
+    print("✓ test_factor_weights_loader_not_started_without_factor_weights")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_portfolio_factor_capability_flags(Path(tmp_dir))
+    print("✓ test_portfolio_factor_capability_flags")
+    test_metrics_results_memoized_until_data_changes()
+    print("✓ test_metrics_results_memoized_until_data_changes")
+
+    test_group_sums_match_groupby()
+    print("✓ test_group_sums_match_groupby")
+
+    test_empty_metrics_dtypes_match_duckdb()
+    print("✓ test_empty_metrics_dtypes_match_duckdb")
+
+    test_metrics_by_numeric_dimension()
+    print("✓ test_metrics_by_numeric_dimension")
+
+    test_compute_allocations_large_result()
+    print("✓ test_compute_allocations_large_result")
+
     test_invalid_dimension_validation()
     print("✓ test_invalid_dimension_validation")
 
@@ -0,0 +1,98 @@
+"""
+This module provides test cases for the portopt module.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import cvxpy as cp
+from portopt.portopt import (load_data, extract_data, opt_port,
+                             FUND_MATRIX, ASSET_CLASS_TARGETS, FUND_ALLOCATIONS,
+                             ASSET_CLASS_ALLOCATIONS, OPT_STATUS, OPT_VALUE)
+
+EXAMPLE_FUND_MATRIX = Path(__file__).resolve().parent.parent / 'data' / 'example_fund_matrix.csv'
+
+def load_example_data(funds=None):
+    """Extract the example fund matrix and targets."""
+    return extract_data(load_data(EXAMPLE_FUND_MATRIX), funds=funds)
+
+def with_targets(data, targets):
+    """Return a copy of extracted data with other target allocations."""
+    data = dict(data)
+    data[ASSET_CLASS_TARGETS] = np.ascontiguousarray(targets, dtype=np.float64)
+    return data
+
+def solve_reference_problem(data, sparsity_weight=0.0, max_funds=None, min_alloc=0.0):
+    """Solve the allocation problem built directly from the data (not parameterized)."""
+    fund_matrix = data[FUND_MATRIX]
+    num_funds = fund_matrix.shape[0]
+    x = cp.Variable(num_funds)
+    objective = cp.sum_squares(fund_matrix.T @ x - data[ASSET_CLASS_TARGETS])
+    constraints = [cp.sum(x) == 1, x >= 0]
+    if sparsity_weight != 0 or max_funds is not None or min_alloc > 0:
+        z = cp.Variable(num_funds, boolean=True)
+        objective = objective + sparsity_weight * cp.sum(z)
+        constraints += [x >= min_alloc * z, x <= z]
+        if max_funds is not None:
+            constraints.append(cp.sum(z) <= max_funds)
+        solver = cp.SCIP
+    else:
+        solver = cp.CLARABEL
+    problem = cp.Problem(cp.Minimize(objective), constraints)
+    problem.solve(solver=solver)
+    return problem, x.value
+
+def check_opt_port_result(result, data, expected_value):
+    """Check an opt_port result against the data and the reference objective value."""
+    fund_allocations = result[FUND_ALLOCATIONS]
+    assert result[OPT_STATUS] == 'optimal'
+    assert np.isclose(result[OPT_VALUE], expected_value, rtol=1e-3, atol=1e-6)
+    # negative allocations within the solver tolerance are clipped
+    assert (fund_allocations >= 0).all()
+    assert np.isclose(fund_allocations.sum(), 1, atol=1e-4)
+    np.testing.assert_allclose(result[ASSET_CLASS_ALLOCATIONS],
+                               data[FUND_MATRIX].T @ fund_allocations, atol=1e-6)
+
+def test_opt_port_qp_matches_reference_problem():
+    """Test the OSQP solved QP against the problem built directly from the example data."""
+    for funds in [None, ['FUND01', 'FUND02', 'FUND04', 'FUND05', 'FUND10', 'FUND22', 'FUND23']]:
+        data = load_example_data(funds)
+        reference, reference_allocations = solve_reference_problem(data)
+
+        result = opt_port(dict(data))
+        check_opt_port_result(result, data, reference.value)
+        np.testing.assert_allclose(result[ASSET_CLASS_ALLOCATIONS],
+                                   data[FUND_MATRIX].T @ reference_allocations, atol=1e-3)
+
+def test_opt_port_miqp_matches_reference_problem():
+    """Test the parameterized MIQP against the problem built directly from the example data."""
+    data = load_example_data()
+    for sparsity_weight, max_funds, min_alloc in [(1e-4, None, 0.0), (0.0, 5, 0.0),
+                                                  (0.0, 4, 0.05), (1e-4, 6, 0.02)]:
+        reference, _ = solve_reference_problem(data, sparsity_weight, max_funds, min_alloc)
+
+        result = opt_port(dict(data), sparsity_weight, max_funds, min_alloc)
+        check_opt_port_result(result, data, reference.value)
+        selected = result[FUND_ALLOCATIONS][result[FUND_ALLOCATIONS] > 1e-6]
+        if max_funds is not None:
+            assert len(selected) <= max_funds
+        assert (selected >= min_alloc - 1e-6).all()
+
+def test_opt_port_results_not_shared_between_accounts():
+    """Test that solving an account with the same shape keeps the earlier results."""
+    data = load_example_data()
+    targets = data[ASSET_CLASS_TARGETS]
+    # the second account targets the first fund's allocations exactly
+    other_targets = data[FUND_MATRIX][0] / data[FUND_MATRIX][0].sum()
+
+    r1 = opt_port(with_targets(data, targets))
+    expected_funds = r1[FUND_ALLOCATIONS].copy()
+    expected_classes = r1[ASSET_CLASS_ALLOCATIONS].copy()
+    r2 = opt_port(with_targets(data, other_targets))
+
+    assert r1[OPT_STATUS] == 'optimal' and r2[OPT_STATUS] == 'optimal'
+    assert r1[FUND_ALLOCATIONS] is not r2[FUND_ALLOCATIONS]
+    np.testing.assert_array_equal(r1[FUND_ALLOCATIONS], expected_funds)
+    np.testing.assert_array_equal(r1[ASSET_CLASS_ALLOCATIONS], expected_classes)
+    assert not np.allclose(r1[FUND_ALLOCATIONS], r2[FUND_ALLOCATIONS], atol=1e-3)
+    np.testing.assert_allclose(r2[ASSET_CLASS_ALLOCATIONS], other_targets, atol=1e-3)
@@ -5,7 +5,10 @@ This module provides test cases for the rebalance module.
 import pytest
 import pandas as pd
 import numpy as np
-from portopt.rebalance import PortfolioRebalancer, AccountRebalancer
+import cvxpy as cp
+from portopt.metrics import MetricsMixin
+from portopt.rebalance import PortfolioRebalancer, AccountRebalancer, RebalanceMixin
+import portopt.rebalance as rebalance_module
 import portopt.rebalance_utils as rebu
 from portopt.utils import write_weights
 
@@ -197,4 +200,194 @@ def test_random_portfolio_rebalance():
     for account_name in portfolio_rebalancer.getAccounts():
         account_rebalancer = portfolio_rebalancer.getAccountRebalancer(account_name)
         # run the factor-only rebalance test & validate results
-        run_factor_only_rebalance_test(account_rebalancer, verbose=verbose)
\ No newline at end of file
+        run_factor_only_rebalance_test(account_rebalancer, verbose=verbose)
+
+class RebalanceHost(RebalanceMixin, MetricsMixin):
+    """Minimal host class that provides the data used by RebalanceMixin.rebalance."""
+
+    def __init__(self, holdings: pd.DataFrame, prices: pd.DataFrame, factor_weights: pd.DataFrame):
+        self.getHoldings = lambda **kwargs: holdings
+        self.getPrices = lambda **kwargs: prices
+        self.getFactorWeights = lambda **kwargs: factor_weights
+        self.getAccountTickers = lambda **kwargs: pd.DataFrame(index=holdings.index)
+
+def create_random_rebalance_host(num_tickers: int, num_factors: int, accounts: list[str], seed: int):
+    """
+    Create a RebalanceHost with random holdings, prices and factor weights.
+
+    Returns:
+        Tuple of the host, the factor weights matrix (tickers x factors) and
+        random target factor allocations
+    """
+    rng = np.random.default_rng(seed)
+    tickers = pd.Index([f'T{i}' for i in range(num_tickers)], name='Ticker')
+    factors = pd.Index([f'F{i}' for i in range(num_factors)], name='Factor')
+    index = pd.MultiIndex.from_product([tickers, accounts], names=['Ticker', 'Account'])
+    holdings = pd.DataFrame({'Quantity': rng.uniform(1, 100, len(index))}, index=index)
+    prices = pd.DataFrame({'Price': rng.uniform(1, 100, num_tickers)}, index=tickers)
+    weights = pd.DataFrame(rng.dirichlet(np.ones(num_factors), num_tickers),
+                           index=tickers, columns=factors)
+    factor_weights = weights.stack().rename('Weight').to_frame()
+    target = pd.Series(rng.dirichlet(np.ones(num_factors)), index=factors)
+    return RebalanceHost(holdings, prices, factor_weights), weights, target
+
+def test_rebalance_reuses_problem_across_penalties():
+    """
+    Test that repeated rebalances re-use the parameterized problem and match a
+    problem built from scratch.
+    """
+    host, weights, target = create_random_rebalance_host(8, 4, ['IRA', 'Taxable'], seed=0)
+    tickers, factors = weights.index, weights.columns
+    current = host.getMetrics('Ticker')['Allocation'].reindex(tickers).to_numpy()
+
+    for turnover_penalty in [0.0, 0.5, 2.0]:
+        ticker_results, factor_results = host.rebalance(target, turnover_penalty=turnover_penalty)
+
+        # Solve the same problem from scratch
+        x = cp.Variable(len(tickers))
+        problem = cp.Problem(
+            cp.Minimize(cp.sum_squares(weights.T.to_numpy() @ x - target.to_numpy())
+                        + turnover_penalty * cp.sum_squares(x - current)),
+            [cp.sum(x) == 1, x >= 0]
+        )
+        problem.solve(solver=cp.CLARABEL)
+
+        assert np.isclose(ticker_results['New Allocation'].sum(), 1.0)
+        assert (ticker_results['New Allocation'] >= 0).all(), "Allocations should not be negative"
+        assert np.allclose(ticker_results['New Allocation'], x.value, atol=1e-5)
+        assert np.allclose(factor_results['New Allocation'], weights.T.to_numpy() @ x.value, atol=1e-5)
+
+    # The factor weights matrix is created once for the same inputs
+    factor_matrix = host._factor_matrix_cache[3]
+    assert np.array_equal(factor_matrix, weights.T.to_numpy())
+
+    # The binary selection variables are only added when they are needed
+    ticker_results, _ = host.rebalance(target, complexity_penalty=1.0)
+    assert host._factor_matrix_cache[3] is factor_matrix
+    assert (ticker_results['New Allocation'] > 1e-6).sum() == 1
+    assert list(host._rebalance_problems) == [(len(factors), len(tickers), False),
+                                              (len(factors), len(tickers), True)]
+
+def test_rebalance_memoizes_results():
+    """
+    Test that repeated rebalances with the same arguments return the memoized
+    result until the portfolio data changes.
+    """
+    host, weights, target = create_random_rebalance_host(6, 3, ['IRA'], seed=1)
+    ticker_results, factor_results = host.rebalance(target, turnover_penalty=0.5)
+
+    # The same arguments return a copy of the memoized result without solving
+    problem = host._rebalance_problems[(len(weights.columns), len(weights.index), False)]['problem']
+    solve_time = problem.solver_stats.solve_time
+    ticker_results['New Allocation'] = 0.0
+    memoized_tickers, memoized_factors = host.rebalance(target.copy(), turnover_penalty=0.5)
+    assert problem.solver_stats.solve_time == solve_time
+    assert np.isclose(memoized_tickers['New Allocation'].sum(), 1.0)
+    pd.testing.assert_frame_equal(memoized_factors, factor_results)
+    assert len(host._rebalance_results) == 1
+
+    # Different arguments are solved again
+    host.rebalance(target, turnover_penalty=2.0)
+    assert len(host._rebalance_results) == 2
+
+    # Refreshed portfolio data drops the memoized results
+    refreshed = host.getFactorWeights().copy()
+    host.getFactorWeights = lambda **kwargs: refreshed
+    host.rebalance(target, turnover_penalty=0.5)
+    assert len(host._rebalance_results) == 1
+
+def test_adjust_factor_allocations():
+    """
+    Test that allocation is transferred between factors and that unknown source
+    and destination factors raise a KeyError.
+    """
+    host, weights, _ = create_random_rebalance_host(6, 4, ['IRA'], seed=2)
+    base = host.getMetrics('Factor', portfolio_allocation=True)['Allocation']
+
+    results = host.adjust_factor_allocations({'Factor': ['F0', 'F1']}, {'Factor': 'F2'}, 0.05)
+    new = results['New Allocation']
+    assert np.isclose(new[['F0', 'F1']].sum(), base[['F0', 'F1']].sum() - 0.05)
+    assert np.isclose(new['F2'], base['F2'] + 0.05)
+    assert np.isclose(new['F3'], base['F3'])
+    assert np.isclose(new.sum(), base.sum())
+
+    # Factor metrics with a factor missing from the current allocations
+    get_metrics = host.getMetrics
+    def get_metrics_with_unknown_factor(*dimensions, filters=None, **kwargs):
+        metrics = get_metrics(*dimensions, filters=filters, **kwargs)
+        if filters == {'Factor': 'F2'}:
+            metrics.loc['UNKNOWN'] = metrics.iloc[0]
+        return metrics
+    host.getMetrics = get_metrics_with_unknown_factor
+    with pytest.raises(KeyError, match='UNKNOWN'):
+        host.adjust_factor_allocations({'Factor': 'F0'}, {'Factor': 'F2'}, 0.05)
+    with pytest.raises(KeyError, match='UNKNOWN'):
+        host.adjust_factor_allocations({'Factor': 'F2'}, {'Factor': 'F0'}, 0.05)
+
+def test_rebalance_falls_back_to_next_solver(monkeypatch):
+    """
+    Test that rebalance falls back to the next installed solver when a solver
+    cannot solve the problem, and uses an explicitly requested solver.
+    """
+    host, _, target = create_random_rebalance_host(6, 3, ['IRA'], seed=2)
+
+    # OSQP cannot solve problems with binary variables, so SCIP is used
+    monkeypatch.setattr(rebalance_module, 'MIQP_SOLVERS', (cp.OSQP, cp.SCIP))
+    ticker_results, _ = host.rebalance(target, complexity_penalty=1.0)
+    assert (ticker_results['New Allocation'] > 1e-6).sum() == 1
+
+    # An explicitly requested solver is not replaced
+    with pytest.raises(cp.error.SolverError):
+        host.rebalance(target, complexity_penalty=1.0, solver=cp.OSQP)
+
+    ticker_results, _ = host.rebalance(target, solver=cp.CLARABEL)
+    default_results, _ = host.rebalance(target)
+    assert np.allclose(ticker_results['New Allocation'], default_results['New Allocation'], atol=1e-5)
+
+def test_account_rebalance_without_integers():
+    """
+    Test that the account rebalance problem only includes the binary selection
+    variables when the complexity penalty or minimum ticker allocation is set.
+    """
+    account_rebalancer = rebu.create_simple_account_rebalancer('TestAccount')
+    problem = account_rebalancer.rebalance()
+    assert not problem.is_mixed_integer()
+    assert len(account_rebalancer.getConstraints()) == 2
+    assert (account_rebalancer.getNewTickerAllocations() >= 0).all()
+
+    account_rebalancer = rebu.create_simple_account_rebalancer('TestAccount',
+                                                               complexity_penalty=1.0)
+    problem = account_rebalancer.rebalance()
+    assert problem.is_mixed_integer()
+    assert len(account_rebalancer.getConstraints()) == 4
+
+def test_solver_falls_back_on_non_optimal_status(monkeypatch):
+    """
+    Test that the next solver is tried when a solver does not find an optimal
+    solution, and that the status of the last solver is kept.
+    """
+    class StubProblem:
+        def __init__(self, statuses):
+            self.statuses = statuses
+            self.solvers = []
+
+        def solve(self, solver, **kwargs):
+            self.solvers.append(solver)
+            self.status = self.statuses[solver]
+
+    monkeypatch.setattr(rebalance_module, 'QP_SOLVERS', (cp.OSQP, cp.CLARABEL))
+
+    problem = StubProblem({cp.OSQP: 'optimal_inaccurate', cp.CLARABEL: 'optimal'})
+    rebalance_module._solve_rebalance_problem(problem, has_integers=False)
+    assert problem.solvers == [cp.OSQP, cp.CLARABEL]
+    assert problem.status == 'optimal'
+
+    problem = StubProblem({cp.OSQP: 'user_limit', cp.CLARABEL: 'infeasible_inaccurate'})
+    rebalance_module._solve_rebalance_problem(problem, has_integers=False)
+    assert problem.solvers == [cp.OSQP, cp.CLARABEL]
+    assert problem.status == 'infeasible_inaccurate'
+
+    # An optimal solution is not solved again
+    problem = StubProblem({cp.OSQP: 'optimal', cp.CLARABEL: 'optimal'})
+    rebalance_module._solve_rebalance_problem(problem, has_integers=False)
+    assert problem.solvers == [cp.OSQP]